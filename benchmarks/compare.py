@@ -0,0 +1,53 @@
+"""
+compare two benchmark result files written by benchmarks.run
+
+    python -m benchmarks.compare old.json new.json [--threshold 1.1]
+"""
+import argparse
+import json
+
+
+def load_results(filename):
+    with open(filename) as handle:
+        report = json.load(handle)
+    return {(result["name"], json.dumps(result["params"], sort_keys=True)): result
+            for result in report["results"]}
+
+
+def compare(old, new, threshold=1.1):
+    """
+    ratio of the best times of the benchmarks found in both runs
+
+    arguments:
+    old, new: dict
+        results as returned by load_results
+    threshold: float
+        ratio above which a benchmark counts as slower (and below whose
+        inverse it counts as faster)
+
+    returns:
+
+    list: tuple
+        name, params, old and new best time, ratio new/old and status
+    """
+    rows = []
+    for key in sorted(old.keys() & new.keys()):
+        ratio = new[key]["best"] / old[key]["best"]
+        status = "slower" if ratio > threshold else "faster" if ratio < 1/threshold else ""
+        rows.append((*key, old[key]["best"], new[key]["best"], ratio, status))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="compare two benchmark runs")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=1.1)
+    args = parser.parse_args(argv)
+    rows = compare(load_results(args.old), load_results(args.new), args.threshold)
+    for name, params, old, new, ratio, status in rows:
+        print(f"{name:<55} {params:<35} {old*1e3:10.3f} {new*1e3:10.3f} ms {ratio:6.2f}x {status}")
+
+
+if __name__ == "__main__":
+    main()
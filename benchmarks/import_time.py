@@ -0,0 +1,83 @@
+"""
+cold-start import time of the compute-only API
+
+    python -m benchmarks.import_time [--budget 0.2] [--output startup.json]
+
+Every sample imports the packages in a fresh interpreter. The run fails
+(exit status 1) when the median exceeds the budget or when a plotting or
+optimization dependency gets imported.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+# median cold-start time allowed for the compute-only imports (s)
+IMPORT_BUDGET = 0.2
+MODULES = ("src.survey", "src.plan", "src.direction_change", "src.steering")
+# heavy dependencies the compute-only API must not import
+FORBIDDEN = ("matplotlib", "scipy")
+
+_PROBE = """
+import sys, time, json
+tic = time.perf_counter()
+import numpy
+numpy_time = time.perf_counter() - tic
+tic = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - tic
+print(json.dumps({{"numpy": numpy_time, "packages": elapsed,
+                  "loaded": [name for name in {forbidden!r} if name in sys.modules]}}))
+"""
+
+
+def measure(modules=MODULES, repeat=7):
+    """
+    import the modules in fresh interpreters from the repository root
+
+    returns:
+
+    dict:
+        median numpy and package import times (s), all samples and the
+        forbidden modules that were loaded
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = _PROBE.format(modules=tuple(modules), forbidden=FORBIDDEN)
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], cwd=root, check=True,
+                                capture_output=True, text=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {"numpy": float(np.median([s["numpy"] for s in samples])),
+            "packages": float(np.median([s["packages"] for s in samples])),
+            "samples": [s["packages"] for s in samples],
+            "loaded": sorted({name for s in samples for name in s["loaded"]})}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="cold-start import time of the compute-only API")
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET,
+                        help="largest median import time of the packages (s)")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--output", help="JSON result file")
+    args = parser.parse_args(argv)
+    result = measure(repeat=args.repeat)
+    result["budget"] = args.budget
+    print(f"numpy {result['numpy']*1e3:.1f} ms, packages {result['packages']*1e3:.1f} ms "
+          f"(budget {args.budget*1e3:.0f} ms)", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(result, handle, indent=2)
+    failed = result["packages"] > args.budget
+    if result["loaded"]:
+        print(f"imported at startup: {', '.join(result['loaded'])}", file=sys.stderr)
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+benchmark suite for the survey methods, plan generation and steering
+
+run from the repository root:
+
+    python -m benchmarks.run --output results.json [--quick] [--filter survey]
+
+and compare two runs with python -m benchmarks.compare old.json new.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .synthetic import synthetic_field, synthetic_survey
+
+SURVEY_METHODS = ("min_curvature_radius", "mean_angle", "curvature_radius",
+                  "balanced_tangent", "tangent")
+STATION_SIZES = (10, 1000, 100000, 1000000)
+WELL_SIZES = (1, 100, 10000)
+STATIONS_PER_WELL = 100
+PATH_POINTS = (200, 100000, 1000000)
+# largest problem size run with --quick
+QUICK_LIMIT = 100000
+
+PLAN_CASES = {"WellTypeI": ((3000, 800, 2, 700), {}),
+              "WellTypeII": ((3309, 945, 2, 640, 2, 3109), {}),
+              "WellTypeIII": ((3000, 2200, 2, 300), {}),
+              "WellHorizontalSingleGain": ((1676, 305, 2500), {}),
+              "WellHorizontalDualGain": ((1676, 305, 2, 1.5, 1000), {"reach": 3438})}
+
+
+def timeit(func, min_time=0.2, max_repeat=50):
+    """
+    time a callable, repeating it until min_time has passed, after one
+    untimed warm-up call (lazy imports, caches)
+
+    returns:
+
+    dict:
+        best, median and mean time in seconds and the number of repeats
+    """
+    func()
+    times = []
+    start = time.perf_counter()
+    while len(times) < max_repeat:
+        tic = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - tic)
+        if time.perf_counter() - start > min_time:
+            break
+    return {"best": min(times), "median": float(np.median(times)),
+            "mean": float(np.mean(times)), "repeat": len(times)}
+
+
+def survey_cases(limit):
+    from src import survey
+    for method in SURVEY_METHODS:
+        for n in STATION_SIZES:
+            if n > limit:
+                continue
+            data = synthetic_survey(n)
+            yield (f"survey.calc_well_path[{method}]", {"stations": n},
+                   lambda data=data, method=method: survey.calc_well_path(data, method=method))
+    for n_wells in WELL_SIZES:
+        if n_wells*STATIONS_PER_WELL > limit:
+            continue
+        md, inc, azim, offsets, starts = synthetic_field(n_wells, STATIONS_PER_WELL)
+        params = {"wells": n_wells, "stations": len(md)}
+        yield ("survey.calc_well_paths", params,
+               lambda md=md, inc=inc, azim=azim, offsets=offsets, starts=starts:
+               survey.calc_well_paths(md, inc, azim, offsets, starts))
+        yield ("survey.station_covariances_batch", params,
+               lambda md=md, inc=inc, azim=azim, offsets=offsets:
+               survey.uncertainty.station_covariances_batch(
+                   md, inc, azim, offsets, [0.1, 1e-3, 3e-3]))
+
+
+def plan_cases(limit):
+    from src import plan
+    for name, (args, kwargs) in PLAN_CASES.items():
+        cls = getattr(plan, name)
+        well = cls(*args, **kwargs)
+        yield f"plan.{name}.calculate", {}, well.calculate
+        well.calculate()
+        for n in PATH_POINTS:
+            if n > limit:
+                continue
+            tvd = np.linspace(0, well.TVD, n)
+            yield (f"plan.{name}.generatePath", {"points": n},
+                   lambda well=well, tvd=tvd: well.generatePath(tvd))
+
+
+def steering_cases(limit):
+    from src import direction_change, steering
+    yield ("direction_change.calc_max_direction_change", {"points": 1},
+           lambda: direction_change.calc_max_direction_change(np.deg2rad(3), np.deg2rad(30)))
+    for n in STATION_SIZES:
+        if n > limit:
+            continue
+        rng = np.random.default_rng(n)
+        beta, inc = rng.uniform(0, 0.1, n), rng.uniform(0.01, np.pi/2, n)
+        yield ("direction_change.calc_max_direction_change_closed_form", {"points": n},
+               lambda beta=beta, inc=inc: direction_change.calc_max_direction_change_closed_form(beta, inc))
+    yield ("steering.plan_steering", {"stands": "to target"},
+           lambda: steering.plan_steering(2000, np.deg2rad(20), np.deg2rad(40),
+                                          np.deg2rad(60), np.deg2rad(120), max_dls=3))
+
+
+SUITES = {"survey": survey_cases, "plan": plan_cases, "steering": steering_cases}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(suites=None, limit=max(STATION_SIZES), pattern=None, min_time=0.2):
+    """
+    run the benchmark suites
+
+    arguments:
+    suites: sequence of str, optional
+        names of SUITES to run (default: all)
+    limit: int
+        largest problem size run
+    pattern: str, optional
+        only run the benchmarks whose name contains it
+    min_time: float
+        least time spent repeating each benchmark
+
+    returns:
+
+    dict:
+        metadata and one result per benchmark
+    """
+    results = []
+    for suite in suites or SUITES:
+        for name, params, func in SUITES[suite](limit):
+            if pattern and pattern not in name:
+                continue
+            result = {"suite": suite, "name": name, "params": params, **timeit(func, min_time)}
+            results.append(result)
+            print(f"{name:<55} {json.dumps(params):<35} {result['best']*1e3:12.3f} ms",
+                  file=sys.stderr)
+    return {"timestamp": datetime.now(timezone.utc).isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON result file")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES),
+                        help="suite to run, may be repeated (default: all)")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true",
+                        help=f"skip problem sizes above {QUICK_LIMIT}")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="least time spent repeating each benchmark (s)")
+    args = parser.parse_args(argv)
+    limit = QUICK_LIMIT if args.quick else max(STATION_SIZES)
+    report = run(args.suite, limit, args.filter, args.min_time)
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"saved {len(report['results'])} results to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
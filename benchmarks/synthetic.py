@@ -0,0 +1,61 @@
+import numpy as np
+
+# depth range of the synthetic wells (m)
+TOTAL_DEPTH = 4500.
+
+
+def synthetic_survey(n_stations, seed=0):
+    """
+    deterministic build-and-hold survey with measurement noise: vertical
+    down to a random kick-off, a build at 1.5 to 3 deg/30m to a random
+    hold angle, and a slow azimuth walk
+
+    arguments:
+    n_stations: int
+        number of stations (at least 2)
+    seed: int
+        random seed, the same seed gives the same survey
+
+    returns:
+
+    ndarray:
+        (n_stations, 3) table of measured depth, inclination and azimuth
+        (radians), the input of calc_well_path
+    """
+    rng = np.random.default_rng(seed)
+    md = np.linspace(0, TOTAL_DEPTH, n_stations)
+    kop = rng.uniform(300, 1500)
+    bur = np.deg2rad(rng.uniform(1.5, 3)) / 30
+    hold = np.deg2rad(rng.uniform(20, 85))
+    inc = np.clip((md - kop)*bur, 0, hold)
+    azim = rng.uniform(0, 2*np.pi) + np.deg2rad(0.2)/30*np.maximum(md - kop, 0)
+    inc = np.abs(inc + rng.normal(0, np.deg2rad(0.05), n_stations))
+    azim = azim + rng.normal(0, np.deg2rad(0.1), n_stations)
+    return np.column_stack((md, inc, azim))
+
+
+def synthetic_field(n_wells, stations_per_well, seed=0):
+    """
+    deterministic field of synthetic_survey wells on a grid of pads
+
+    arguments:
+    n_wells: int
+        number of wells
+    stations_per_well: int
+        number of stations of every well
+    seed: int
+        random seed
+
+    returns:
+
+    tuple: ndarray
+        flat measured depth, inclination and azimuth, the (n_wells + 1)
+        offsets and the (n_wells, 3) start points
+    """
+    from src.survey.batch import pack_surveys
+    surveys = [synthetic_survey(stations_per_well, seed*100003 + w) for w in range(n_wells)]
+    md, inc, azim, offsets = pack_surveys(surveys)
+    side = int(np.ceil(np.sqrt(n_wells)))
+    well = np.arange(n_wells)
+    start_points = np.column_stack((500.*(well // side), 500.*(well % side), np.zeros(n_wells)))
+    return md, inc, azim, offsets, start_points
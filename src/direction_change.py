@@ -18,6 +18,30 @@ def calc_inclination_and_direction(beta, gamma, inc1):
     return depsilon, inc2
 
 
+def calc_attitude_change(beta, gamma, inc1, azim1):
+    """
+    vectorized attitude update for a tool dogleg and tool face, as
+    calc_inclination_and_direction but returning the new azimuth on the
+    correct quadrant, so that changes beyond 90 degrees at low inclination
+    are kept
+
+    beta: tool deflection (dogleg) in radians
+    gamma: tool orientation (tool face from high side) in radians
+    inc1: initial inclination in radians
+    azim1: initial azimuth in radians
+
+    returns:
+    inc2 (final inclination) in radians,
+    azim2 (final azimuth) in radians
+    (all arguments broadcast against each other)
+    """
+    depsilon = np.arctan2(np.sin(beta) * np.sin(gamma),
+                          np.sin(inc1) * np.cos(beta) + np.sin(beta) * np.cos(gamma) * np.cos(inc1))
+    cos_inc2 = np.cos(inc1)*np.cos(beta) - np.sin(beta)*np.cos(gamma)*np.sin(inc1)
+    inc2 = np.arccos(np.clip(cos_inc2, -1, 1))
+    return inc2, azim1 + depsilon
+
+
 def calc_tool_angle(beta, inc1, inc2):
     """
     beta: tool angle deflection (dogleg) in radians
@@ -46,3 +70,85 @@ def calc_max_direction_change(beta, inc1):
     return gamma, de_max
 
 
+
+
+def calc_max_direction_change_closed_form(beta, inc1):
+    """
+    vectorized, closed-form version of calc_max_direction_change
+
+    The direction change tan(de) = tan(beta) sin(gamma) / (sin(inc1) +
+    tan(beta) cos(gamma) cos(inc1)) is stationary where
+    cos(gamma) = -tan(beta) / tan(inc1), which gives
+    tan(de_max) = tan(beta) / sqrt(sin(inc1)^2 - tan(beta)^2 cos(inc1)^2).
+    When tan(beta) cos(inc1) >= sin(inc1) (low inclination or large
+    dogleg) the denominator of tan(de) reaches zero and de tends to its
+    supremum pi/2 at cos(gamma) = -sin(inc1) / (tan(beta) cos(inc1)).
+    A zero dogleg changes nothing: de_max = 0, with gamma = pi/2, the limit
+    of the bounded case, also where the hole is vertical (a = b = 0).
+
+    beta: tool deflection (dogleg) in radians, float or array
+    inc1: initial inclination in radians, float or array
+
+    returns: gamma tool angle and maximum change in direction, in radians,
+    broadcast over beta and inc1
+    """
+    beta = np.asarray(beta, dtype=float)
+    inc1 = np.asarray(inc1, dtype=float)
+    a = np.sin(inc1)
+    b = np.tan(beta) * np.cos(inc1)
+    straight = np.tan(beta) == 0
+    bounded = a > np.abs(b)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = np.where(bounded,
+                         np.arccos(np.clip(-b / a, -1, 1)),
+                         np.arccos(np.clip(-a / b, -1, 1)))
+        de_max = np.where(bounded,
+                          np.arctan(np.tan(beta) / np.sqrt(a**2 - b**2)),
+                          np.pi / 2)
+    gamma = np.where(straight, np.pi / 2, gamma)
+    de_max = np.where(straight, 0., de_max)
+    return gamma, de_max
+
+
+class MaxDirectionChangeTable:
+    """
+    precomputed grid of calc_max_direction_change_closed_form, bilinearly
+    interpolated for interactive steering charts. The exact solution has a
+    kink where tan(beta) = tan(inc1), so the table is least accurate there;
+    call the closed form directly when that region matters
+
+    beta_max: largest tool dogleg covered by the table, in radians
+    inc_max: largest initial inclination covered by the table, in radians
+    n_beta, n_inc: number of grid nodes along each axis
+    """
+
+    def __init__(self, beta_max=np.deg2rad(15), inc_max=np.pi / 2, n_beta=301, n_inc=361):
+        self.beta = np.linspace(0, beta_max, n_beta)
+        self.inc = np.linspace(0, inc_max, n_inc)
+        self.gamma, self.de_max = calc_max_direction_change_closed_form(
+            self.beta[:, None], self.inc[None, :])
+        if np.isnan(self.gamma).any() or np.isnan(self.de_max).any():
+            raise ValueError("the direction change table must cover beta >= 0 and inc1 >= 0")
+
+    def _interpolate(self, grid, beta, inc1):
+        # fractional node positions on the uniform grids, clipped to the table
+        u = np.clip(beta / self.beta[-1], 0, 1) * (len(self.beta) - 1)
+        v = np.clip(inc1 / self.inc[-1], 0, 1) * (len(self.inc) - 1)
+        i = np.minimum(u.astype(int), len(self.beta) - 2)
+        j = np.minimum(v.astype(int), len(self.inc) - 2)
+        du, dv = u - i, v - j
+        return ((1 - du) * (1 - dv) * grid[i, j] + du * (1 - dv) * grid[i + 1, j] +
+                (1 - du) * dv * grid[i, j + 1] + du * dv * grid[i + 1, j + 1])
+
+    def __call__(self, beta, inc1):
+        """
+        beta: tool deflection (dogleg) in radians, float or array
+        inc1: initial inclination in radians, float or array
+
+        returns: interpolated gamma tool angle and maximum change in
+        direction, in radians
+        """
+        beta, inc1 = np.broadcast_arrays(np.asarray(beta, dtype=float),
+                                         np.asarray(inc1, dtype=float))
+        return (self._interpolate(self.gamma, beta, inc1),
+                self._interpolate(self.de_max, beta, inc1))
@@ -0,0 +1,181 @@
+"""
+opt-in timers and counters for the survey and plan pipelines
+
+Instrumentation is off by default: stage() then returns a shared no-op
+context manager and count() returns after one flag check, so the hot paths
+pay almost nothing. Once enabled, every finished stage and every counter
+increment is sent as an event dict to the registered callbacks:
+
+    {"kind": "timer" or "counter", "name": str, "value": float,
+     "attributes": dict}
+
+with the elapsed seconds of a stage, or the increment of a counter, as the
+value. Recorder aggregates the events in memory and JSONLinesExporter
+writes them to a file.
+"""
+import functools
+import json
+import time
+
+_enabled = False
+_callbacks = []
+
+
+def enable(*callbacks):
+    """turn instrumentation on, registering the given callbacks"""
+    global _enabled
+    for callback in callbacks:
+        add_callback(callback)
+    _enabled = True
+
+
+def disable():
+    """turn instrumentation off, keeping the registered callbacks"""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def add_callback(callback):
+    """register a callable receiving every event dict"""
+    if callback not in _callbacks:
+        _callbacks.append(callback)
+
+
+def remove_callback(callback):
+    if callback in _callbacks:
+        _callbacks.remove(callback)
+
+
+def clear_callbacks():
+    del _callbacks[:]
+
+
+def _emit(kind, name, value, attributes):
+    event = {"kind": kind, "name": name, "value": value, "attributes": attributes}
+    for callback in list(_callbacks):
+        callback(event)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("name", "attributes", "start")
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _emit("timer", self.name, time.perf_counter() - self.start, self.attributes)
+        return False
+
+
+def stage(name, **attributes):
+    """
+    time a block of code
+
+        with instrumentation.stage("survey.calc_well_path.segments", stations=n):
+            ...
+
+    arguments:
+    name: str
+        dotted stage name
+    attributes:
+        extra values sent with the event (e.g. problem sizes)
+
+    returns:
+    context manager, a shared no-op one when instrumentation is disabled
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name, attributes)
+
+
+def count(name, value=1, **attributes):
+    """increment a counter (no-op when instrumentation is disabled)"""
+    if _enabled:
+        _emit("counter", name, value, attributes)
+
+
+def instrumented(name=None):
+    """
+    decorator timing every call of a function or method as one stage, named
+    after its module and qualified name unless given
+    """
+    def decorator(func):
+        stage_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(stage_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Recorder:
+    """
+    callback aggregating events in memory: number of events, total, minimum
+    and maximum value for every timer and counter name
+    """
+
+    def __init__(self):
+        self.stats = {}
+
+    def __call__(self, event):
+        key = (event["kind"], event["name"])
+        value = event["value"]
+        stats = self.stats.get(key)
+        if stats is None:
+            self.stats[key] = {"count": 1, "total": value, "min": value, "max": value}
+        else:
+            stats["count"] += 1
+            stats["total"] += value
+            stats["min"] = min(stats["min"], value)
+            stats["max"] = max(stats["max"], value)
+
+    def reset(self):
+        self.stats.clear()
+
+    def summary(self):
+        """list of dicts with kind, name, count, total, mean, min and max, by total"""
+        rows = [{"kind": kind, "name": name, **stats, "mean": stats["total"]/stats["count"]}
+                for (kind, name), stats in self.stats.items()]
+        return sorted(rows, key=lambda row: -row["total"])
+
+
+class JSONLinesExporter:
+    """
+    callback writing one JSON line per event to a text file object, with the
+    wall clock time of the event
+
+    arguments:
+    stream: text file object
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __call__(self, event):
+        self.stream.write(json.dumps({"time": time.time(), **event}, default=str) + "\n")
@@ -1,9 +1,12 @@
 from .type1 import WellTypeI
 from .type2 import WellTypeII
-from .plan_utils import getKOPFromBUR, getKOPFromInclination
+from .plan_utils import (getKOPFromBUR, getKOPFromInclination, resamplePlan,
+                         planToSurvey, plansToSurveys)
 from .type3 import WellTypeIII
 from .horiz_single_gain import WellHorizontalSingleGain
 from .horiz_dual_gain import WellHorizontalDualGain
+from .sweep import sweepWellTypeI, sweepWellTypeII, sweepWellTypeIII, lowestMDDesign
+from .bit_walk import BitWalkModel
 
 __all__ = [
     "WellTypeI",
@@ -12,6 +15,14 @@ __all__ = [
     "WellHorizontalSingleGain",
     "WellHorizontalDualGain",
     "getKOPFromBUR",
-    "getKOPFromInclination"
+    "getKOPFromInclination",
+    "resamplePlan",
+    "planToSurvey",
+    "plansToSurveys",
+    "sweepWellTypeI",
+    "sweepWellTypeII",
+    "sweepWellTypeIII",
+    "lowestMDDesign",
+    "BitWalkModel"
 
 ]
\ No newline at end of file
@@ -0,0 +1,112 @@
+import numpy as np
+
+from ..survey import min_curvature_radius
+
+
+class BitWalkModel:
+    """
+    bit walk and formation tendency model: the bit drifts from the planned
+    attitude at a constant rate of inclination and azimuth change per 30 m,
+    drawn for every Monte Carlo realization from a normal distribution, plus
+    an optional independent rate noise per survey interval
+
+    arguments:
+    build_rate: mean inclination tendency (deg/30m)
+    walk_rate: mean azimuth walk (deg/30m)
+    build_std: standard deviation of the inclination tendency (deg/30m)
+    walk_std: standard deviation of the azimuth walk (deg/30m)
+    correlation: correlation between the build and walk rates
+    interval_std: standard deviation of the rate noise of every survey
+        interval (deg/30m), applied to inclination and azimuth
+    start_md: measured depth where the drift starts (e.g. the kick-off point)
+    """
+
+    def __init__(self, build_rate=0., walk_rate=0., build_std=0., walk_std=0.,
+                 correlation=0., interval_std=0., start_md=0.):
+        self.build_rate = build_rate
+        self.walk_rate = walk_rate
+        self.build_std = build_std
+        self.walk_std = walk_std
+        self.correlation = correlation
+        self.interval_std = interval_std
+        self.start_md = start_md
+
+    def sampleRates(self, n_realizations, n_intervals=1, rng=None):
+        """
+        draw the inclination and azimuth rates of every realization
+
+        arguments:
+        n_realizations: number of Monte Carlo realizations
+        n_intervals: number of survey intervals
+        rng: numpy Generator or seed
+
+        returns:
+        build, walk: (n_realizations, n_intervals) rates in radians per meter
+        """
+        rng = np.random.default_rng(rng)
+        mean = np.deg2rad([self.build_rate, self.walk_rate]) / 30
+        std = np.deg2rad([self.build_std, self.walk_std]) / 30
+        cov = np.outer(std, std) * np.array([[1, self.correlation], [self.correlation, 1]])
+        rates = rng.multivariate_normal(mean, cov, size=n_realizations)
+        noise = rng.standard_normal((2, n_realizations, n_intervals)) * np.deg2rad(self.interval_std) / 30
+        return rates[:, 0, None] + noise[0], rates[:, 1, None] + noise[1]
+
+    def drift(self, md, inc, azim, build, walk):
+        """
+        drifted attitudes of every realization at every station
+
+        arguments:
+        md, inc, azim: (n,) planned stations, angles in radians
+        build, walk: (n_realizations, n - 1) or broadcastable rates in
+            radians per meter, as returned by sampleRates
+
+        returns:
+        inc, azim: (n_realizations, n) drifted inclination and azimuth
+        """
+        md = np.asarray(md, dtype=float)
+        # only the part of each interval below start_md drifts
+        drilled = np.diff(np.maximum(md, self.start_md))
+        zero = np.zeros(np.broadcast(build, walk).shape[:-1] + (1,))
+        d_inc = np.concatenate((zero, np.cumsum(build * drilled, axis=-1)), axis=-1)
+        d_azim = np.concatenate((zero, np.cumsum(walk * drilled, axis=-1)), axis=-1)
+        return np.clip(inc + d_inc, 0, np.pi), azim + d_azim
+
+    def simulate(self, md, inc, azim, n_realizations=1000, initial_pos=(0, 0, 0), rng=None):
+        """
+        run the Monte Carlo realizations as one (realization x station) array
+        computation, with the positions from the minimum curvature formulas
+
+        arguments:
+        md, inc, azim: (n,) planned stations, angles in radians
+        n_realizations: number of Monte Carlo realizations
+        initial_pos: northing, easting and vertical of the first station
+        rng: numpy Generator or seed
+
+        returns:
+        dict with
+            planned: (n, 3) positions of the plan
+            positions: (n_realizations, n, 3) drifted positions
+            offset: (n_realizations, 3) final drifted minus planned position
+            mean: (3,) mean final offset
+            covariance: (3, 3) covariance of the final position
+            std: (3,) standard deviation of northing, easting and vertical
+            horizontal: (n_realizations,) horizontal miss distance at target
+        """
+        md, inc, azim = (np.asarray(x, dtype=float) for x in (md, inc, azim))
+        build, walk = self.sampleRates(n_realizations, len(md) - 1, rng)
+        drift_inc, drift_azim = self.drift(md, inc, azim, build, walk)
+        stations = np.stack(np.broadcast_arrays(md, drift_inc, drift_azim))
+        both = np.concatenate((np.stack((md, inc, azim))[:, None], stations), axis=1)
+        segments = min_curvature_radius.calc_segments(*both[:, :, :-1], *both[:, :, 1:])[..., :3]
+        positions = np.asarray(initial_pos, dtype=float) + np.concatenate(
+            (np.zeros((len(both[0]), 1, 3)), np.cumsum(segments, axis=1)), axis=1)
+        planned, positions = positions[0], positions[1:]
+
+        offset = positions[:, -1] - planned[-1]
+        return {"planned": planned,
+                "positions": positions,
+                "offset": offset,
+                "mean": offset.mean(axis=0),
+                "covariance": np.cov(offset, rowvar=False),
+                "std": offset.std(axis=0),
+                "horizontal": np.hypot(offset[:, 0], offset[:, 1])}
@@ -1,7 +1,8 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from collections import OrderedDict
 from pprint import pprint
+from ..instrumentation import instrumented
+from .plan_utils import evaluatePiecewise, evaluateSections, planSection
 
 class WellHorizontalDualGain:
     def __init__(self, TVD, KOP, BUR1, BUR2, hor_length, reach=None, KOP2=None, max_build=None):
@@ -21,6 +22,7 @@ class WellHorizontalDualGain:
 
         # self.reach = reach - self.reach_EOB
 
+    @instrumented("plan.WellHorizontalDualGain.calculate")
     def calculate(self):
         # Convert build-up rate to radians per meter
         self.BUR1_rad = self.BUR1 / 30
@@ -144,55 +146,64 @@ class WellHorizontalDualGain:
             print("{:<15} {:^15.3f} {:^15.3f} {:^15.3f} {:^15.3f}".format(key, vals["TVD"], vals["REACH"], vals["MD"], vals["LENGTH"]))
         print("---------------------------------------------------------")
 
+    @instrumented("plan.WellHorizontalDualGain.generatePath")
     def generatePath(self, tvd=None):
         # Generate the well path
         if tvd is None:
             tvd = np.concatenate((np.linspace(0, self.TVD, 100), np.linspace(self.TVD, self.TVD, 100)))
-        md = np.zeros_like(tvd)
-        disp = np.zeros_like(tvd)
+        tvd = np.asarray(tvd)
         idx = np.where(tvd == self.TVD)[0][0]
-        for i, z in enumerate(tvd):
-            if z < self.KOP:
-                md[i] = z
-                disp[i] = 0
-            elif z <= self.build1["TVD"]:
-                theta_z = np.arcsin((z - self.KOP) / self.R1)
-                md[i] = self.KOP + self.R1 * theta_z
-                disp[i] = self.R1 * (1 - np.cos(theta_z))
-            elif z <= self.slant["TVD"]:
-                md[i] = self.build1["MD"] + (z - self.build1["TVD"]) / np.cos(self.theta)
-                disp[i] = self.build1["REACH"] + (z - self.build1["TVD"]) * np.tan(self.theta)
-            elif z <= self.build2["TVD"]:
-                if i <= idx:  # In the build-up section, solve for theta_z: z = KOP + R * sin(theta_z)
-                    dV = self.build2["TVD"] - z
-                    theta_z = np.arccos(1 - dV/self.R2)
-                    dD = self.build2["REACH"] - self.slant["REACH"]
-                    md[i] = self.slant["MD"] + self.build2["LENGTH"] - self.R2 * theta_z
-                    disp[i] = self.build2["REACH"] - self.R2*np.sin(theta_z)
-                else:
-                    L_hor = (self.reach-self.reach_EOB)*(i-idx)/(len(tvd)-idx-1)
-                    disp[i] = disp[idx] + L_hor
-                    md[i] = md[idx] + L_hor
+        # points after the first one at the final TVD belong to the horizontal section
+        horizontal = np.arange(len(tvd)) > idx
+
+        def build_up1(z):
+            theta_z = np.arcsin((z - self.KOP) / self.R1)
+            return self.KOP + self.R1 * theta_z, self.R1 * (1 - np.cos(theta_z))
+
+        def slant(z):
+            return (self.build1["MD"] + (z - self.build1["TVD"]) / np.cos(self.theta),
+                    self.build1["REACH"] + (z - self.build1["TVD"]) * np.tan(self.theta))
+
+        def build_up2(z):
+            # In the build-up section, solve for theta_z: z = KOP + R * sin(theta_z)
+            dV = self.build2["TVD"] - z
+            theta_z = np.arccos(1 - dV/self.R2)
+            return (self.slant["MD"] + self.build2["LENGTH"] - self.R2 * theta_z,
+                    self.build2["REACH"] - self.R2*np.sin(theta_z))
+
+        md, disp = evaluatePiecewise(tvd, [
+            (tvd < self.KOP, lambda z: (z, np.zeros_like(z))),
+            (tvd <= self.build1["TVD"], build_up1),
+            (tvd <= self.slant["TVD"], slant),
+            ((tvd <= self.build2["TVD"]) & ~horizontal, build_up2)])
+        horizontal &= ((tvd >= self.KOP) & (tvd > self.build1["TVD"]) &
+                       (tvd > self.slant["TVD"]) & (tvd <= self.build2["TVD"]))
+        L_hor = (self.reach-self.reach_EOB)*(np.flatnonzero(horizontal)-idx)/(len(tvd)-idx-1)
+        disp[horizontal] = disp[idx] + L_hor
+        md[horizontal] = md[idx] + L_hor
         return {"TVD": tvd, "MD": md, "Displacement": disp}
 
-    def plot(self):
-        # Create a DataFrame for the trajectory
-        plt.figure(figsize=(5, 5))
-        ax = plt.gca()
-        wellpath = self.generatePath()
-        ax.plot(wellpath["Displacement"], wellpath["TVD"],
-                 label='Well Trajectory')
-        ax.set_xlabel('Horizontal Displacement (m)')
-        ax.set_ylabel('True Vertical Depth (m)')
-        ax.set_title("Horizontal Well (1 build-up) Trajectory Plan (Input: TVD)")
-        Lax = max(self.reach, self.TVD)
-        ax.set(xlim=(-0.1*Lax, 1.1*Lax),
-                ylim=(-0.1*Lax, 1.1*Lax))
-        x_spec = [x["REACH"] for x in self.milestones.values()]
-        y_spec = [x["TVD"] for x in self.milestones.values()]
-        ax.plot(x_spec, y_spec, 'ko', label='Key Points')
-        ax.invert_yaxis()
-        ax.legend()
-        ax.grid(True)
-        plt.show()
+    def getSections(self):
+        """
+        constant curvature sections of the calculated plan, from surface to
+        the final milestone, as plan_utils.planSection dicts
+        """
+        return [planSection({"MD": 0, "TVD": 0, "REACH": 0}, 0, 0, self.KOP),
+                planSection(self.kickoff, 0, self.BUR1_rad, self.build1["LENGTH"]),
+                planSection(self.build1, self.theta, 0, self.slant["LENGTH"]),
+                planSection(self.slant, self.theta, self.BUR2_rad, self.build2["LENGTH"]),
+                planSection(self.build2, self.final_inc, 0, self.horizontal_section["LENGTH"])]
+
+    @instrumented("plan.WellHorizontalDualGain.generatePathAtMD")
+    def generatePathAtMD(self, md):
+        """
+        evaluate the plan at an array of measured depths, exactly on its arcs
+
+        returns:
+        dict with the MD, TVD, Displacement and Inclination (radians) of each point
+        """
+        return evaluateSections(self.getSections(), md)
 
+    def plot(self):
+        from .plotting import plotPlan
+        plotPlan(self, 'Horizontal Well (1 build-up) Trajectory Plan (Input: TVD)')
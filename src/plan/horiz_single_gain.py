@@ -1,7 +1,8 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from collections import OrderedDict
 from pprint import pprint
+from ..instrumentation import instrumented
+from .plan_utils import evaluatePiecewise, evaluateSections, planSection
 
 class WellHorizontalSingleGain:
     def __init__(self, TVD, KOP, reach):
@@ -11,6 +12,7 @@ class WellHorizontalSingleGain:
         self.R = self.TVD - self.KOP  # Radius of curvature (m)
         self.BUR = np.rad2deg(1 / self.R) * 30  # Build-up rate (degrees/30m)
 
+    @instrumented("plan.WellHorizontalSingleGain.calculate")
     def calculate(self):
         # Convert build-up rate to radians per meter
         self.BUR_rad = np.deg2rad(self.BUR) / 30
@@ -57,46 +59,49 @@ class WellHorizontalSingleGain:
                 key, milestone["TVD"], milestone["REACH"], milestone["MD"], milestone["LENGTH"] ))
         print("---------------------------------------------------------")
 
+    @instrumented("plan.WellHorizontalSingleGain.generatePath")
     def generatePath(self, tvd = None):
         # Generate the well path
         if tvd is None:
             tvd = np.concatenate((np.linspace(0, self.TVD, 100), np.linspace(self.TVD, self.TVD, 100)))
-        md = np.zeros_like(tvd)
-        disp = np.zeros_like(tvd)
+        tvd = np.asarray(tvd)
         idx = np.where(tvd == self.TVD)[0][0]
-        for i, z in enumerate(tvd):
-            if z < self.KOP:
-                md[i] = z
-                disp[i] = 0
-            elif z <= self.final["TVD"]:
-                if i <= idx:# In the build-up section, solve for theta_z: z = KOP + R * sin(theta_z)
-                    theta_z = np.arcsin((z - self.KOP) / self.build1["REACH"])
-                    md[i] = self.KOP + self.R * theta_z
-                    disp[i] = self.R * (1 - np.cos(theta_z))
-                else:
-                    L_hor = (self.reach-self.R)*(i-idx)/(len(tvd)-idx-1)
-                    disp[i] = disp[idx] + L_hor
-                    md[i] = self.build1["MD"] + L_hor
+        # points after the first one at the final TVD belong to the horizontal section
+        horizontal = np.arange(len(tvd)) > idx
+
+        def build_up(z):
+            # In the build-up section, solve for theta_z: z = KOP + R * sin(theta_z)
+            theta_z = np.arcsin((z - self.KOP) / self.build1["REACH"])
+            return self.KOP + self.R * theta_z, self.R * (1 - np.cos(theta_z))
+
+        md, disp = evaluatePiecewise(tvd, [
+            (tvd < self.KOP, lambda z: (z, np.zeros_like(z))),
+            ((tvd <= self.final["TVD"]) & ~horizontal, build_up)])
+        horizontal &= (tvd >= self.KOP) & (tvd <= self.final["TVD"])
+        L_hor = (self.reach-self.R)*(np.flatnonzero(horizontal)-idx)/(len(tvd)-idx-1)
+        disp[horizontal] = disp[idx] + L_hor
+        md[horizontal] = self.build1["MD"] + L_hor
         return {"TVD": tvd, "MD": md, "Displacement": disp}
 
-    def plot(self):
-        # Create a DataFrame for the trajectory
-        plt.figure(figsize=(5, 5))
-        ax = plt.gca()
-        well_path = self.generatePath()
-        ax.plot(well_path["Displacement"], well_path["TVD"],
-                 label='Well Trajectory')
-        ax.set_xlabel('Horizontal Displacement (m)')
-        ax.set_ylabel('True Vertical Depth (m)')
-        ax.set_title("Horizontal Well (1 build-up) Trajectory Plan (Input: TVD)")
-        Lax = max(self.reach, self.TVD)
-        ax.set(xlim=(-0.1*Lax, 1.1*Lax),
-                ylim=(-0.1*Lax, 1.1*Lax))
-        x_spec = [x["REACH"] for x in self.milestones.values()]
-        y_spec = [x["TVD"] for x in self.milestones.values()]
-        ax.plot(x_spec, y_spec, 'ok', label='Key Points')
-        ax.invert_yaxis()
-        ax.legend()
-        ax.grid(True)
-        plt.show()
+    def getSections(self):
+        """
+        constant curvature sections of the calculated plan, from surface to
+        the final milestone, as plan_utils.planSection dicts
+        """
+        return [planSection({"MD": 0, "TVD": 0, "REACH": 0}, 0, 0, self.KOP),
+                planSection(self.kickoff, 0, 1 / self.R, self.build1["LENGTH"]),
+                planSection(self.build1, self.theta, 0, self.final["LENGTH"])]
 
+    @instrumented("plan.WellHorizontalSingleGain.generatePathAtMD")
+    def generatePathAtMD(self, md):
+        """
+        evaluate the plan at an array of measured depths, exactly on its arcs
+
+        returns:
+        dict with the MD, TVD, Displacement and Inclination (radians) of each point
+        """
+        return evaluateSections(self.getSections(), md)
+
+    def plot(self):
+        from .plotting import plotPlan
+        plotPlan(self, 'Horizontal Well (1 build-up) Trajectory Plan (Input: TVD)')
@@ -1,5 +1,8 @@
 import numpy as np
 
+from ..survey.batch import pack_surveys
+from ..survey.md_index import md_grid
+
 def getKOPFromBUR(reach, TVD, BUR):
     BUR_rad = np.deg2rad(BUR) / 30
     R = 1 / BUR_rad  # Radius of curvature (m)
@@ -13,4 +16,136 @@ def getKOPFromInclination(reach, TVD, inc):
     dV = np.tan(theta) * reach
     KOP = TVD - dV
     R = dV / np.sin(theta)
-    return KOP, R
\ No newline at end of file
+    return KOP, R
+
+def evaluatePiecewise(tvd, sections):
+    """
+    evaluate a piecewise well path over a whole array of vertical depths
+
+    arguments:
+    tvd: ndarray with the vertical depths of the path points
+    sections: sequence of (mask, function) pairs, the function maps the
+        vertical depths of the points of its section to (MD, displacement).
+        As in an if/elif chain, each point takes the first section whose mask
+        holds, and points outside every section are left at zero
+
+    returns:
+    md, disp: ndarrays with the measured depth and displacement of each point
+    """
+    tvd = np.asarray(tvd)
+    md = np.zeros(tvd.shape)
+    disp = np.zeros(tvd.shape)
+    assigned = np.zeros(tvd.shape, dtype=bool)
+    for mask, section in sections:
+        mask = np.broadcast_to(mask, tvd.shape) & ~assigned
+        if mask.any():
+            md[mask], disp[mask] = section(tvd[mask])
+        assigned |= mask
+    return md, disp
+
+def planSection(start, inclination, curvature, length):
+    """
+    one constant curvature section of a 2D plan
+
+    arguments:
+    start: milestone dict (MD, TVD, REACH) where the section starts
+    inclination: inclination at the start of the section (radians)
+    curvature: rate of inclination change (radians per meter), positive
+        when building and negative when dropping, 0 on straight sections
+    length: measured depth length of the section
+
+    returns:
+    dict with the MD, TVD, REACH, INC, CURVATURE and LENGTH of the section
+    """
+    return {"MD": start["MD"], "TVD": start["TVD"], "REACH": start["REACH"],
+            "INC": inclination, "CURVATURE": curvature, "LENGTH": length}
+
+def evaluateSections(sections, md):
+    """
+    evaluate a plan made of constant curvature sections over a whole array
+    of measured depths, exactly on its arcs, so that horizontal sections are
+    sampled as well as the vertical ones
+
+    arguments:
+    sections: sequence of planSection dicts, in measured depth order
+    md: ndarray with the measured depths of the path points
+
+    returns:
+    dict with the MD, TVD, Displacement and Inclination (radians) of each
+    point, NaN outside the plan
+    """
+    md = np.asarray(md, dtype=float)
+    table = {key: np.array([section[key] for section in sections], dtype=float)
+             for key in ("MD", "TVD", "REACH", "INC", "CURVATURE", "LENGTH")}
+    index = np.clip(np.searchsorted(table["MD"], md, side="right") - 1, 0, len(sections) - 1)
+    s = md - table["MD"][index]
+    inc0 = table["INC"][index]
+    half = 0.5*table["CURVATURE"][index]*s
+    # chord of the arc, s*sinc(half), along the mean inclination inc0 + half
+    chord = s*np.sinc(half/np.pi)
+    tvd = table["TVD"][index] + chord*np.cos(inc0 + half)
+    disp = table["REACH"][index] + chord*np.sin(inc0 + half)
+    inc = inc0 + 2*half
+    end = table["MD"][-1] + table["LENGTH"][-1]
+    outside = (md < 0) | (md > end)
+    tvd[outside] = disp[outside] = inc[outside] = np.nan
+    return {"MD": md, "TVD": tvd, "Displacement": disp, "Inclination": inc}
+
+def resamplePlan(plan, step, include_milestones=True):
+    """
+    evaluate a calculated plan at a uniform measured depth step
+
+    arguments:
+    plan: calculated plan object (WellTypeI, WellTypeII, ...)
+    step: measured depth spacing (e.g. 1 m, or 3.048 for every 10 ft)
+    include_milestones: if True, the milestone depths are kept among the points
+
+    returns:
+    dict with the MD, TVD, Displacement and Inclination (radians) of each point
+    """
+    sections = plan.getSections()
+    end = sections[-1]["MD"] + sections[-1]["LENGTH"]
+    include = [x["MD"] for x in plan.milestones.values()] if include_milestones else None
+    return evaluateSections(sections, md_grid(0, end, step, include))
+
+def planToSurvey(plan, azimuth, step=30., include_milestones=True):
+    """
+    survey stations along a calculated plan, at a measured depth step and in
+    the vertical plane of a target azimuth, so that the plan can go through
+    calc_well_path, the dogleg, anti-collision and export code like a
+    surveyed well. Every station takes the exact inclination of its section,
+    so the minimum curvature path through the stations is the plan itself
+
+    arguments:
+    plan: calculated plan object (WellTypeI, WellTypeII, ...)
+    azimuth: azimuth of the plan vertical section (deg), e.g. from
+        location_utils.angleFromLocation
+    step: measured depth spacing of the stations
+    include_milestones: if True, a station is placed at every milestone
+
+    returns:
+    (n, 3) ndarray with the measured depth, inclination and azimuth (radians)
+    of every station, the input of calc_well_path
+    """
+    path = resamplePlan(plan, step, include_milestones)
+    return np.column_stack((path["MD"], path["Inclination"],
+                            np.full(len(path["MD"]), np.deg2rad(azimuth))))
+
+def plansToSurveys(plans, azimuths, step=30., include_milestones=True):
+    """
+    planToSurvey for many plans, packed into flat arrays as in
+    survey.batch.pack_surveys
+
+    arguments:
+    plans: sequence of calculated plan objects
+    azimuths: azimuth of every plan (deg), or one azimuth for all
+    step: measured depth spacing of the stations
+    include_milestones: if True, a station is placed at every milestone
+
+    returns:
+    md, inc, azim, offsets: flat station arrays (radians) and the
+    (n_plans + 1) offsets of the plans
+    """
+    azimuths = np.broadcast_to(azimuths, (len(plans),))
+    return pack_surveys([planToSurvey(plan, azimuth, step, include_milestones)
+                         for plan, azimuth in zip(plans, azimuths)])
@@ -0,0 +1,34 @@
+import matplotlib.pyplot as plt
+
+
+def plotPlan(well, title, equal_axes=False):
+    """
+    plot the vertical section of a calculated plan with its milestones.
+    Imported by the plan classes only when they plot, so that computing
+    plans does not load matplotlib
+
+    arguments:
+    well: calculated plan object (WellTypeI, WellTypeII, ...)
+    title: figure title
+    equal_axes: if True, use the same scale on both axes
+    """
+    plt.figure(figsize=(5, 5))
+    ax = plt.gca()
+    well_path = well.generatePath()
+    ax.plot(well_path["Displacement"], well_path["TVD"],
+            label='Well Trajectory')
+    ax.set_xlabel('Horizontal Displacement (m)')
+    ax.set_ylabel('True Vertical Depth (m)')
+    ax.set_title(title)
+    Lax = max(well.reach, well.TVD)
+    ax.set(xlim=(-0.1*Lax, 1.1*Lax),
+           ylim=(-0.1*Lax, 1.1*Lax))
+    x_spec = [x["REACH"] for x in well.milestones.values()]
+    y_spec = [x["TVD"] for x in well.milestones.values()]
+    ax.plot(x_spec, y_spec, 'ko', label='Key Points')
+    ax.invert_yaxis()
+    if equal_axes:
+        ax.axis('equal')
+    ax.legend()
+    ax.grid(True)
+    plt.show()
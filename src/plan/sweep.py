@@ -0,0 +1,208 @@
+import numpy as np
+from collections import OrderedDict
+from .plan_utils import getKOPFromBUR
+
+
+def _milestone(MD, TVD, REACH, LENGTH, feasible):
+    """milestone dict of masked arrays, masked where the design is infeasible"""
+    values = {"MD": MD, "TVD": TVD, "REACH": REACH, "LENGTH": LENGTH}
+    return {key: np.ma.masked_array(np.broadcast_to(value, feasible.shape).astype(float),
+                                    mask=~feasible)
+            for key, value in values.items()}
+
+
+def _result(milestones, theta, feasible):
+    return {"milestones": milestones,
+            "theta": np.ma.masked_array(theta, mask=~feasible),
+            "feasible": feasible}
+
+
+def sweepWellTypeI(TVD, KOP, BUR, reach=None, max_build=None):
+    """
+    solve Type I (build and hold) plans for whole arrays of parameters, as
+    WellTypeI.calculate does for one design. All parameters broadcast
+    against each other
+
+    arguments:
+    TVD: final vertical depth (m)
+    KOP: kick-off point (m)
+    BUR: build-up rate (deg/30m)
+    reach: target horizontal displacement (m), used when max_build is None
+    max_build: maximum build angle (deg)
+
+    returns:
+    dict with
+        milestones: OrderedDict of milestone dicts (MD, TVD, REACH, LENGTH)
+            of masked arrays, as WellTypeI.milestones
+        theta: masked array with the build angle (radians)
+        feasible: bool array, False where the design has no solution (target
+            inside the build radius, no kick-off room or a negative slant)
+    """
+    if reach is None and max_build is None:
+        raise ValueError("At least reach or max_build must be provided")
+    TVD, KOP, BUR = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (TVD, KOP, BUR)))
+    R = 1 / (np.deg2rad(BUR) / 30)  # Radius of curvature (m)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if max_build is None:
+            reach = np.asarray(reach, dtype=float)
+            radius_to_reach = np.sqrt((R-reach)**2 + (TVD-KOP)**2)
+            omega = np.arcsin(R / radius_to_reach)
+            tau = np.arctan((R-reach)/(TVD - KOP))
+            theta = omega - tau
+            feasible = (reach > 0) & (R <= radius_to_reach)
+        else:
+            theta = np.deg2rad(max_build) + np.zeros_like(R)
+            feasible = np.ones(theta.shape, dtype=bool)
+        theta, TVD, KOP, R = np.broadcast_arrays(theta, TVD, KOP, R)
+        BU_length = theta * R
+        build_TVD = KOP + R * np.sin(theta)
+        build_REACH = R * (1 - np.cos(theta))
+        slant_length = (TVD - build_TVD) / np.cos(theta)
+        feasible = (feasible & (BUR > 0) & (KOP >= 0) & (KOP < TVD) &
+                    (theta > 0) & (theta < np.pi/2) & (slant_length >= 0))
+
+    milestones = OrderedDict()
+    milestones["KOP"] = _milestone(KOP, KOP, 0, KOP, feasible)
+    milestones["Build-up"] = _milestone(KOP + BU_length, build_TVD, build_REACH, BU_length, feasible)
+    milestones["Slant section"] = _milestone(KOP + BU_length + slant_length,
+                                             build_TVD + slant_length * np.cos(theta),
+                                             build_REACH + slant_length * np.sin(theta),
+                                             slant_length, feasible)
+    milestones["Final"] = milestones["Slant section"]
+    return _result(milestones, theta, feasible)
+
+
+def sweepWellTypeII(TVD, KOP, BUR, reach, DOR, EOD):
+    """
+    solve Type II (build, hold and drop) plans for whole arrays of
+    parameters, as WellTypeII.calculate does for one design. All parameters
+    broadcast against each other
+
+    arguments:
+    TVD: final vertical depth (m)
+    KOP: kick-off point (m)
+    BUR: build-up rate (deg/30m)
+    reach: target horizontal displacement (m)
+    DOR: drop-off rate (deg/30m)
+    EOD: end of drop-off (TVD, m)
+
+    returns:
+    dict with
+        milestones: OrderedDict of milestone dicts (MD, TVD, REACH, LENGTH)
+            of masked arrays, as WellTypeII.milestones
+        theta: masked array with the build (and drop) angle (radians)
+        feasible: bool array, False where the radii do not fit between KOP
+            and EOD or the slant section would be negative
+    """
+    TVD, KOP, BUR, reach, DOR, EOD = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (TVD, KOP, BUR, reach, DOR, EOD)))
+    R = 1 / (np.deg2rad(BUR) / 30)
+    R_drop = 1 / (np.deg2rad(DOR) / 30)
+    sum_R = R + R_drop
+    dV = EOD - KOP
+    with np.errstate(divide="ignore", invalid="ignore"):
+        large_radii = sum_R > reach
+        angle_Y = np.arctan(dV / np.abs(sum_R - reach))
+        sin_Z = np.sin(angle_Y) * sum_R / dV
+        angle_Z = np.arccos(sin_Z)
+        theta = np.where(large_radii, angle_Y - angle_Z, np.pi - angle_Y - angle_Z)
+
+        BU_length = theta * R
+        build_TVD = KOP + R * np.sin(theta)
+        build_REACH = R * (1 - np.cos(theta))
+        tvd_start_drop = EOD - R_drop * np.sin(theta)
+        slant_length = (tvd_start_drop - build_TVD) / np.cos(theta)
+        slant_REACH = build_REACH + (tvd_start_drop - build_TVD) * np.tan(theta)
+        drop_length = theta * R_drop
+        drop_TVD = tvd_start_drop + R_drop * np.sin(theta)
+        drop_MD = KOP + BU_length + slant_length + drop_length
+        feasible = ((BUR > 0) & (DOR > 0) & (KOP >= 0) & (dV > 0) & (EOD <= TVD) &
+                    (np.abs(sin_Z) <= 1) & (theta > 0) & (theta < np.pi/2) &
+                    (slant_length >= 0))
+
+    milestones = OrderedDict()
+    milestones["KOP"] = _milestone(KOP, KOP, 0, KOP, feasible)
+    milestones["Build-up"] = _milestone(KOP + BU_length, build_TVD, build_REACH, BU_length, feasible)
+    milestones["Slant section"] = _milestone(KOP + BU_length + slant_length,
+                                             build_TVD + slant_length * np.cos(theta),
+                                             slant_REACH, slant_length, feasible)
+    milestones["Drop-off"] = _milestone(drop_MD, drop_TVD,
+                                        slant_REACH + R_drop * (1 - np.cos(theta)),
+                                        drop_length, feasible)
+    milestones["Final"] = _milestone(drop_MD + TVD - drop_TVD, TVD, reach,
+                                     TVD - drop_TVD, feasible)
+    return _result(milestones, theta, feasible)
+
+
+def sweepWellTypeIII(TVD, KOP, BUR, reach, tolerance=1.0):
+    """
+    solve Type III (continuous build) plans for whole arrays of parameters,
+    as WellTypeIII.calculate does for one design. All parameters broadcast
+    against each other
+
+    arguments:
+    TVD: final vertical depth (m)
+    KOP: kick-off point (m), or None to place it with getKOPFromBUR so that
+        the build-up ends at the target
+    BUR: build-up rate (deg/30m)
+    reach: target horizontal displacement (m)
+    tolerance: largest distance (m) between the end of the build-up and the
+        target for the design to count as feasible, None to skip the check
+
+    returns:
+    dict with
+        milestones: OrderedDict of milestone dicts (MD, TVD, REACH, LENGTH)
+            of masked arrays, as WellTypeIII.milestones
+        theta: masked array with the build angle (radians)
+        feasible: bool array, False where the target lies inside the build
+            radius, there is no room below the kick-off or the build-up
+            misses the target by more than the tolerance
+    """
+    with np.errstate(invalid="ignore"):
+        if KOP is None:
+            KOP = getKOPFromBUR(reach, TVD, BUR)
+    TVD, KOP, BUR, reach = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (TVD, KOP, BUR, reach)))
+    R = 1 / (np.deg2rad(BUR) / 30)
+    dV = TVD - KOP
+    delta_D = R - reach
+    with np.errstate(divide="ignore", invalid="ignore"):
+        radius_to_reach = np.sqrt(delta_D**2 + dV**2)
+        # a target on the build circle may land a rounding error inside it
+        ratio = R / radius_to_reach
+        omega = np.arcsin(np.where(np.isclose(ratio, 1, rtol=1e-12, atol=0), 1, ratio))
+        tau = np.arctan(delta_D/dV)
+        theta = omega - tau
+        feasible = ((BUR > 0) & (KOP >= 0) & (dV > 0) & (reach > 0) &
+                    np.isfinite(omega) & (theta > 0) & (theta < np.pi/2))
+    BU_length = np.round(theta * R, 5)
+    build_TVD = np.round(KOP + R * np.sin(theta), 5)
+    build_REACH = np.round(R * (1 - np.cos(theta)), 5)
+    if tolerance is not None:
+        with np.errstate(invalid="ignore"):
+            feasible &= np.hypot(build_TVD - TVD, build_REACH - reach) <= tolerance
+
+    milestones = OrderedDict()
+    milestones["KOP"] = _milestone(KOP, KOP, 0, KOP, feasible)
+    milestones["Build-up"] = _milestone(KOP + BU_length, build_TVD, build_REACH,
+                                        BU_length, feasible)
+    milestones["Final"] = milestones["Build-up"]
+    return _result(milestones, theta, feasible)
+
+
+def lowestMDDesign(result):
+    """
+    find the feasible design with the lowest final measured depth
+
+    arguments:
+    result: dict returned by one of the sweep functions
+
+    returns:
+    index: tuple indexing the parameter grid, or None if nothing is feasible
+    md: final measured depth of that design
+    """
+    md = result["milestones"]["Final"]["MD"]
+    if md.count() == 0:
+        return None, None
+    index = np.unravel_index(np.ma.argmin(md), md.shape)
+    return index, float(md[index])
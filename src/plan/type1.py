@@ -1,7 +1,8 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from collections import OrderedDict
 from pprint import pprint
+from ..instrumentation import instrumented
+from .plan_utils import evaluatePiecewise, evaluateSections, planSection
 
 class WellTypeI:
     def __init__(self, TVD, KOP, BUR, reach=None, max_build=None):
@@ -14,6 +15,7 @@ class WellTypeI:
             raise ValueError("At least reach or max_build must be provided")
 
 
+    @instrumented("plan.WellTypeI.calculate")
     def calculate(self):
         # Convert build-up rate to radians per meter
         self.BUR_rad = self.BUR / 30
@@ -89,45 +91,47 @@ class WellTypeI:
             ))
         print("---------------------------------------------------------")
 
+    @instrumented("plan.WellTypeI.generatePath")
     def generatePath(self, tvd = None):
         # Generate the well path
         if tvd is None:
             tvd = np.linspace(0, self.TVD, 200)
-        md = np.zeros_like(tvd)
-        disp = np.zeros_like(tvd)
-        for i, z in enumerate(tvd):
-            if z < self.KOP:
-                md[i] = z
-                disp[i] = 0
-            elif z < self.build1["TVD"]:
-                # In the build-up section, solve for theta_z: z = KOP + R * sin(theta_z)
-                theta_z = np.arcsin((z - self.KOP) / self.R)
-                md[i] = self.KOP + self.R * theta_z
-                disp[i] = self.R * (1 - np.cos(theta_z))
-            else:
-                # In the tangent section
-                md[i] = self.build1["MD"] + (z - self.build1["TVD"]) / np.cos(self.theta)
-                disp[i] = self.build1["REACH"] + (z - self.build1["TVD"]) * np.sin(self.theta) / np.cos(self.theta)
+        tvd = np.asarray(tvd)
+
+        def build_up(z):
+            # In the build-up section, solve for theta_z: z = KOP + R * sin(theta_z)
+            theta_z = np.arcsin((z - self.KOP) / self.R)
+            return self.KOP + self.R * theta_z, self.R * (1 - np.cos(theta_z))
+
+        def tangent(z):
+            return (self.build1["MD"] + (z - self.build1["TVD"]) / np.cos(self.theta),
+                    self.build1["REACH"] + (z - self.build1["TVD"]) * np.sin(self.theta) / np.cos(self.theta))
+
+        md, disp = evaluatePiecewise(tvd, [
+            (tvd < self.KOP, lambda z: (z, np.zeros_like(z))),
+            (tvd < self.build1["TVD"], build_up),
+            (True, tangent)])
         return {"TVD": tvd, "MD": md, "Displacement": disp}
 
-    def plot(self):
-        # Create a DataFrame for the trajectory
-        plt.figure(figsize=(5, 5))
-        ax = plt.gca()
-        wellpath = self.generatePath()
-        ax.plot(wellpath["Displacement"], wellpath["TVD"],
-                 label='Well Trajectory')
-        ax.set_xlabel('Horizontal Displacement (m)')
-        ax.set_ylabel('True Vertical Depth (m)')
-        ax.set_title('Type I Well Trajectory Plan (Input: TVD)')
-        Lax = max(self.reach, self.TVD)
-        ax.set(xlim=(-0.1*Lax, 1.1*Lax),
-                ylim=(-0.1*Lax, 1.1*Lax))
-        x_spec = [x["REACH"] for x in self.milestones.values()]
-        y_spec = [x["TVD"] for x in self.milestones.values()]
-        ax.plot(x_spec, y_spec, 'ko', label='Key Points')
-        ax.invert_yaxis()
-        ax.legend()
-        ax.grid(True)
-        plt.show()
+    def getSections(self):
+        """
+        constant curvature sections of the calculated plan, from surface to
+        the final milestone, as plan_utils.planSection dicts
+        """
+        return [planSection({"MD": 0, "TVD": 0, "REACH": 0}, 0, 0, self.KOP),
+                planSection(self.kickoff, 0, self.BUR_rad, self.build1["LENGTH"]),
+                planSection(self.build1, self.theta, 0, self.slant["LENGTH"])]
 
+    @instrumented("plan.WellTypeI.generatePathAtMD")
+    def generatePathAtMD(self, md):
+        """
+        evaluate the plan at an array of measured depths, exactly on its arcs
+
+        returns:
+        dict with the MD, TVD, Displacement and Inclination (radians) of each point
+        """
+        return evaluateSections(self.getSections(), md)
+
+    def plot(self):
+        from .plotting import plotPlan
+        plotPlan(self, 'Type I Well Trajectory Plan (Input: TVD)')
@@ -1,7 +1,8 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from collections import OrderedDict
 from pprint import pprint
+from ..instrumentation import instrumented
+from .plan_utils import evaluatePiecewise, evaluateSections, planSection
 
 class WellTypeII:
     def __init__(self, TVD, KOP, BUR, reach, DOR, EOD):
@@ -12,6 +13,7 @@ class WellTypeII:
         self.DOR = np.deg2rad(DOR)  # Drop-off rate (deg/30m)
         self.EOD = EOD  # End of drop-off (TVD)
 
+    @instrumented("plan.WellTypeII.calculate")
     def calculate(self):
         # Build-up section
         self.BUR_rad = self.BUR / 30
@@ -112,58 +114,64 @@ class WellTypeII:
             ))
         print("---------------------------------------------------------")
 
+    @instrumented("plan.WellTypeII.generatePath")
     def generatePath(self, tvd=None):
         # Generate the well path for Type II well (with drop-off)
         if tvd is None:
             tvd = np.linspace(0, self.TVD, 300)
-        md = np.zeros_like(tvd)
-        disp = np.zeros_like(tvd)
-        for i, z in enumerate(tvd):
-            if z < self.KOP:
-                md[i] = z
-                disp[i] = 0
-            elif z < self.build1["TVD"]:
-                # Build-up section
-                theta_z = np.arcsin((z - self.KOP) / self.R)
-                md[i] = self.KOP + self.R * theta_z
-                disp[i] = self.R * (1 - np.cos(theta_z))
-            elif z < self.slant["TVD"]:
-                # Tangent section
-                md[i] = self.build1["MD"] + (z - self.build1["TVD"]) / np.cos(self.theta_BU)
-                disp[i] = self.build1["REACH"] + (z - self.build1["TVD"]) * np.tan(self.theta_BU)
-            elif z <= self.EOD:
-                # Drop-off section (curves back toward vertical)
-                theta_drop = np.arcsin((self.EOD - self.slant["TVD"]) / self.R_drop)
-                Daux = self.R_drop * np.cos(theta_drop)
-                theta_drop_z = np.arcsin((self.EOD - z) / self.R_drop)
-                Daux2 = self.R_drop * np.cos(theta_drop_z)
-                md[i] = self.slant["MD"] + self.R_drop * (theta_drop - theta_drop_z)
-                disp[i] = self.slant["REACH"] + Daux2 - Daux
-                # self.R_drop * (np.cos((theta_drop_z - theta_drop)))
-            else:
-                # Vertical section after drop-off
-                md[i] = self.final["MD"] + (z - self.drop1["TVD"])
-                disp[i] = self.final["REACH"]
+        tvd = np.asarray(tvd)
 
+        def build_up(z):
+            theta_z = np.arcsin((z - self.KOP) / self.R)
+            return self.KOP + self.R * theta_z, self.R * (1 - np.cos(theta_z))
+
+        def tangent(z):
+            return (self.build1["MD"] + (z - self.build1["TVD"]) / np.cos(self.theta_BU),
+                    self.build1["REACH"] + (z - self.build1["TVD"]) * np.tan(self.theta_BU))
+
+        def drop_off(z):
+            # Drop-off section (curves back toward vertical)
+            theta_drop = np.arcsin((self.EOD - self.slant["TVD"]) / self.R_drop)
+            Daux = self.R_drop * np.cos(theta_drop)
+            theta_drop_z = np.arcsin((self.EOD - z) / self.R_drop)
+            Daux2 = self.R_drop * np.cos(theta_drop_z)
+            return (self.slant["MD"] + self.R_drop * (theta_drop - theta_drop_z),
+                    self.slant["REACH"] + Daux2 - Daux)
+
+        def vertical(z):
+            # Vertical section after drop-off
+            return (self.final["MD"] + (z - self.drop1["TVD"]),
+                    np.full_like(z, self.final["REACH"], dtype=float))
+
+        md, disp = evaluatePiecewise(tvd, [
+            (tvd < self.KOP, lambda z: (z, np.zeros_like(z))),
+            (tvd < self.build1["TVD"], build_up),
+            (tvd < self.slant["TVD"], tangent),
+            (tvd <= self.EOD, drop_off),
+            (True, vertical)])
         return {"TVD": tvd, "MD": md, "Displacement": disp}
 
-    def plot(self):
-        plt.figure(figsize=(5, 5))
-        ax = plt.gca()
-        well_path = self.generatePath()
-        ax.plot(well_path["Displacement"], well_path["TVD"], label='Well Trajectory')
-        ax.set_xlabel('Horizontal Displacement (m)')
-        ax.set_ylabel('True Vertical Depth (m)')
-        ax.set_title('Type II Well Trajectory Plan (with Drop-off)')
-        Lax = max(self.reach, self.TVD)
-        ax.set(xlim=(-0.1*Lax, 1.1*Lax),
-                ylim=(-0.1*Lax, 1.1*Lax))
-        x_spec = [x["REACH"] for x in self.milestones.values()]
-        y_spec = [x["TVD"] for x in self.milestones.values()]
-        ax.plot(x_spec, y_spec, 'ko', label='Key Points')
-        ax.invert_yaxis()
-        ax.axis('equal')
-        ax.legend()
-        ax.grid(True)
-        plt.show()
+    def getSections(self):
+        """
+        constant curvature sections of the calculated plan, from surface to
+        the final milestone, as plan_utils.planSection dicts
+        """
+        return [planSection({"MD": 0, "TVD": 0, "REACH": 0}, 0, 0, self.KOP),
+                planSection(self.kickoff, 0, self.BUR_rad, self.build1["LENGTH"]),
+                planSection(self.build1, self.theta_BU, 0, self.slant["LENGTH"]),
+                planSection(self.slant, self.theta_BU, -self.DOR_rad, self.drop1["LENGTH"]),
+                planSection(self.drop1, self.theta_BU - self.theta_drop, 0, self.final["LENGTH"])]
+
+    @instrumented("plan.WellTypeII.generatePathAtMD")
+    def generatePathAtMD(self, md):
+        """
+        evaluate the plan at an array of measured depths, exactly on its arcs
 
+        returns:
+        dict with the MD, TVD, Displacement and Inclination (radians) of each point
+        """
+        return evaluateSections(self.getSections(), md)
+
+    def plot(self):
+        from .plotting import plotPlan
+        plotPlan(self, 'Type II Well Trajectory Plan (with Drop-off)', equal_axes=True)
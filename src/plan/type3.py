@@ -1,8 +1,8 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from collections import OrderedDict
 from pprint import pprint
-from .plan_utils import getKOPFromBUR
+from ..instrumentation import instrumented
+from .plan_utils import getKOPFromBUR, evaluatePiecewise, evaluateSections, planSection
 
 
 
@@ -13,6 +13,7 @@ class WellTypeIII:
         self.BUR = BUR
         self.reach = reach
 
+    @instrumented("plan.WellTypeIII.calculate")
     def calculate(self):
         # Convert build-up rate to radians per meter
         self.BUR_rad = np.deg2rad(self.BUR) / 30
@@ -66,41 +67,41 @@ class WellTypeIII:
             ))
         print("---------------------------------------------------------")
 
+    @instrumented("plan.WellTypeIII.generatePath")
     def generatePath(self, tvd = None):
         # Generate the well path
         if tvd is None:
             tvd = np.linspace(0, self.TVD, 200)
-        md = np.zeros_like(tvd)
-        disp = np.zeros_like(tvd)
-        for i, z in enumerate(tvd):
-            if z < self.KOP:
-                md[i] = z
-                disp[i] = 0
-            elif z <= self.build1["TVD"]:
-                # In the build-up section, solve for theta_z: z = KOP + R * sin(theta_z)
-                theta_z = np.arcsin((z - self.KOP) / self.R)
-                md[i] = self.KOP + self.R * theta_z
-                disp[i] = self.R * (1 - np.cos(theta_z))
+        tvd = np.asarray(tvd)
+
+        def build_up(z):
+            # In the build-up section, solve for theta_z: z = KOP + R * sin(theta_z)
+            theta_z = np.arcsin((z - self.KOP) / self.R)
+            return self.KOP + self.R * theta_z, self.R * (1 - np.cos(theta_z))
+
+        md, disp = evaluatePiecewise(tvd, [
+            (tvd < self.KOP, lambda z: (z, np.zeros_like(z))),
+            (tvd <= self.build1["TVD"], build_up)])
         return {"TVD": tvd, "MD": md, "Displacement": disp}
 
-    def plot(self):
-        # Create a DataFrame for the trajectory
-        plt.figure(figsize=(5, 5))
-        ax = plt.gca()
-        wellpath = self.generatePath()
-        ax.plot(wellpath["Displacement"], wellpath["TVD"],
-                 label='Well Trajectory')
-        ax.set_xlabel('Horizontal Displacement (m)')
-        ax.set_ylabel('True Vertical Depth (m)')
-        ax.set_title('Type I Well Trajectory Plan (Input: TVD)')
-        Lax = max(self.reach, self.TVD)
-        x_spec = [x["REACH"] for x in self.milestones.values()]
-        y_spec = [x["TVD"] for x in self.milestones.values()]
-        ax.plot(x_spec, y_spec, 'ko', label='Key Points')
-        ax.set(xlim=(-0.1*Lax, 1.1*Lax),
-                ylim=(-0.1*Lax, 1.1*Lax))
-        ax.invert_yaxis()
-        ax.legend()
-        ax.grid(True)
-        plt.show()
+    def getSections(self):
+        """
+        constant curvature sections of the calculated plan, from surface to
+        the final milestone, as plan_utils.planSection dicts
+        """
+        return [planSection({"MD": 0, "TVD": 0, "REACH": 0}, 0, 0, self.KOP),
+                planSection(self.kickoff, 0, self.BUR_rad, self.build1["LENGTH"])]
 
+    @instrumented("plan.WellTypeIII.generatePathAtMD")
+    def generatePathAtMD(self, md):
+        """
+        evaluate the plan at an array of measured depths, exactly on its arcs
+
+        returns:
+        dict with the MD, TVD, Displacement and Inclination (radians) of each point
+        """
+        return evaluateSections(self.getSections(), md)
+
+    def plot(self):
+        from .plotting import plotPlan
+        plotPlan(self, 'Type I Well Trajectory Plan (Input: TVD)')
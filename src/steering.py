@@ -0,0 +1,118 @@
+import numpy as np
+
+from .direction_change import calc_attitude_change
+from .survey.kernels import dogleg
+from .survey.wellpath import localCsysFromAngles
+
+
+def _wrap(angle):
+    return (angle + np.pi) % (2*np.pi) - np.pi
+
+
+def plan_steering(md0, inc0, azim0, target_inc, target_azim, max_dls,
+                  stand_length=30., max_stands=200, n_tool_faces=36, n_doglegs=4,
+                  beam_width=32, tool_face_weight=0.05, dogleg_weight=0.1,
+                  tolerance=np.deg2rad(0.01)):
+    """
+    plan one tool face and dogleg per stand taking the bit from its current
+    attitude to a target attitude without exceeding a dogleg severity limit
+
+    Every stand evaluates all candidate tool faces and dogleg levels for all
+    kept sequences at once with calc_attitude_change, plus the tool face
+    that points straight at the target. A beam search keeps the best
+    sequences, ranked by an estimate of the stands still needed (one while
+    the target is not reached plus the remaining angle over the largest
+    dogleg per stand) plus penalties on tool face changes (reorientation
+    time) and on the accumulated dogleg, all in units of stands, so that a
+    stand of progress always outweighs a tool face change.
+
+    md0: measured depth of the current station
+    inc0, azim0: current inclination and azimuth in radians
+    target_inc, target_azim: target inclination and azimuth in radians
+    max_dls: dogleg severity limit in degrees per 30 m
+    stand_length: measured depth drilled per stand
+    max_stands: largest number of stands planned
+    n_tool_faces: number of tool faces evaluated, evenly spaced
+    n_doglegs: number of dogleg levels between 0 and the limit
+    beam_width: number of sequences kept after every stand
+    tool_face_weight: cost, in stands, per radian of tool face change
+        between stands
+    dogleg_weight: cost, in stands, per radian of accumulated dogleg
+    tolerance: remaining angle (radians) at which the target is reached
+
+    returns: dict with
+        survey: (n + 1, 3) table of measured depth, inclination and azimuth
+            (radians) from the current station, ready for calc_well_path
+        tool_face: (n,) tool face of every stand in radians
+        dogleg: (n,) dogleg of every stand in radians
+        dls: (n,) dogleg severity of every stand in degrees per 30 m
+        misalignment: remaining angle to the target in radians
+        reached: True if the misalignment is within the tolerance
+    """
+    beta_max = np.deg2rad(max_dls) * stand_length / 30
+    grid_gamma = np.linspace(0, 2*np.pi, n_tool_faces, endpoint=False)
+    grid_beta = beta_max * np.arange(1, n_doglegs + 1) / n_doglegs
+    grid_gamma, grid_beta = [g.ravel() for g in np.meshgrid(grid_gamma, grid_beta)]
+    # holding the attitude is one extra candidate
+    grid_gamma = np.append(grid_gamma, 0.)
+    grid_beta = np.append(grid_beta, 0.)
+    target = np.stack(localCsysFromAngles(target_inc, target_azim, vectors_only=True)[0])
+
+    inc = np.array([inc0], dtype=float)
+    azim = np.array([azim0], dtype=float)
+    score = np.zeros(1)
+    last_gamma = np.full(1, np.nan)
+    history = []
+    remaining = dogleg(inc, azim, target_inc, target_azim)
+
+    def to_go(remaining):
+        # stands still needed, counting the unfinished one in full
+        return np.where(remaining <= tolerance, 0., 1 + remaining/beta_max)
+
+    for _ in range(max_stands):
+        if remaining.min() <= tolerance:
+            break
+        # the tool face of the great circle towards the target lands on it
+        # exactly whenever the remaining angle fits in one stand
+        _, normal, binormal = localCsysFromAngles(inc, azim, vectors_only=True)
+        direct_gamma = np.arctan2(binormal @ target, normal @ target)
+        direct_beta = np.minimum(remaining, beta_max)
+        gamma = np.column_stack((np.broadcast_to(grid_gamma, (len(inc), len(grid_gamma))), direct_gamma))
+        beta = np.column_stack((np.broadcast_to(grid_beta, (len(inc), len(grid_beta))), direct_beta))
+
+        new_inc, new_azim = calc_attitude_change(beta, gamma, inc[:, None], azim[:, None])
+        new_remaining = dogleg(new_inc, new_azim, target_inc, target_azim)
+        turn = np.where(np.isnan(last_gamma)[:, None] | (beta == 0), 0,
+                        np.abs(_wrap(gamma - last_gamma[:, None])))
+        cost = score[:, None] + tool_face_weight*turn + dogleg_weight*beta
+        ranking = (to_go(new_remaining) + cost).ravel()
+        keep = np.argsort(ranking, kind="stable")[:beam_width]
+        parent, candidate = np.unravel_index(keep, gamma.shape)
+
+        inc = new_inc[parent, candidate]
+        azim = new_azim[parent, candidate]
+        score = cost[parent, candidate]
+        remaining = new_remaining[parent, candidate]
+        chosen_gamma = gamma[parent, candidate]
+        last_gamma = np.where(beta[parent, candidate] == 0, last_gamma[parent], chosen_gamma)
+        history.append((parent, chosen_gamma, beta[parent, candidate], inc, azim))
+
+    best = int(np.argmin(to_go(remaining) + score))
+    n = len(history)
+    table = np.empty((n + 1, 3))
+    tool_face = np.empty(n)
+    betas = np.empty(n)
+    table[0] = md0, inc0, azim0
+    beam = best
+    for stand in range(n - 1, -1, -1):
+        parent, chosen_gamma, chosen_beta, stand_inc, stand_azim = history[stand]
+        table[stand + 1] = md0 + (stand + 1)*stand_length, stand_inc[beam], stand_azim[beam]
+        tool_face[stand] = chosen_gamma[beam] % (2*np.pi)
+        betas[stand] = chosen_beta[beam]
+        beam = parent[beam]
+    return {"survey": table,
+            "tool_face": tool_face,
+            "dogleg": betas,
+            "dls": np.rad2deg(betas) / (stand_length / 30),
+            "misalignment": float(remaining[best]),
+            "reached": bool(remaining[best] <= tolerance)}
@@ -1,80 +1,102 @@
-from . import (tangent, balanced_tangent, curvature_radius, mean_angle,
+from . import (kernels, tangent, balanced_tangent, curvature_radius, mean_angle,
                min_curvature_radius)
+import importlib
 import numpy as np
-from matplotlib import pyplot as plt
 from collections import OrderedDict
+from .. import instrumentation
 
-def calc_well_path(data, initial_pos = [0,0,0], target=np.deg2rad(0), method = "min_curvature_radius", display=False):
-    data = np.array(data)
-    methods = {"min_curvature_radius": min_curvature_radius.calc_segment,
-                "mean_angle": mean_angle.calc_segment,
-                "curvature_radius": curvature_radius.calc_segment,
-                "balanced_tangent": balanced_tangent.calc_segment,
-                "tangent": tangent.calc_segment}
-    calc_func = methods.get(method)
+SEGMENT_METHODS = {"min_curvature_radius": min_curvature_radius.calc_segments,
+                   "mean_angle": mean_angle.calc_segments,
+                   "curvature_radius": curvature_radius.calc_segments,
+                   "balanced_tangent": balanced_tangent.calc_segments,
+                   "tangent": tangent.calc_segments}
+
+TERM_METHODS = {"min_curvature_radius": min_curvature_radius.calc_segments_from_terms,
+                "mean_angle": mean_angle.calc_segments_from_terms,
+                "curvature_radius": curvature_radius.calc_segments_from_terms,
+                "balanced_tangent": balanced_tangent.calc_segments_from_terms,
+                "tangent": tangent.calc_segments_from_terms}
+# methods reading the mean-angle terms of kernels.segment_terms
+MEAN_TERM_METHODS = ("mean_angle", "curvature_radius")
+
+def get_segment_method(method):
+    calc_func = SEGMENT_METHODS.get(method)
+    if calc_func is None:
+        raise ValueError(f"Method '{method}' is not recognized.")
+    return calc_func
+
+def segments_from_terms(start, end, method="min_curvature_radius"):
+    """
+    calculate the segments and their dogleg severity from precomputed
+    station terms, so that the trigonometry of every station and the
+    dogleg of every segment are evaluated once
+
+    arguments:
+    start, end: dict
+        station terms (kernels.station_terms) of the first and second
+        station of each segment
+    method: str
+        survey method name
+
+    returns:
+
+    ndarray: float
+        (n, 5) segments laid out as in calc_well_path
+    """
+    calc_func = TERM_METHODS.get(method)
     if calc_func is None:
         raise ValueError(f"Method '{method}' is not recognized.")
-    segments = []
-    for i, line in enumerate(data[1:], 1):
-        segments.append(calc_func(*data[i-1], *line) +
-                        [DogLegSeverity(*data[i-1], *line)])
-
-    segments = np.array(segments)
-    reach0 = np.sqrt(initial_pos[0]**2 + initial_pos[1]**2)
-    path = np.array(segments)
-    path[:,0] = initial_pos[0] + np.cumsum(path[:,0])  # Northing
-    path[:,1] = initial_pos[1] + np.cumsum(path[:,1])  # Easting
-    path[:,2] = initial_pos[2] + np.cumsum(path[:,2])  # Vertical
-    path[:,3] = reach0 + np.cumsum(path[:,3])  # Reach
-    print("reach0:", path[:,3])
+    segment = {"dogleg": kernels.dogleg_from_terms(start, end)}
+    if method in MEAN_TERM_METHODS:
+        segment.update(kernels.mean_terms(start, end))
+    segments = np.empty((len(start["md"]), 5))
+    segments[:, :4] = calc_func(start, end, segment)
+    segments[:, 4] = np.rad2deg(segment["dogleg"])/((end["md"] - start["md"])/30)
+    return segments
+
+def calc_well_path(data, initial_pos = [0,0,0], target=np.deg2rad(0), method = "min_curvature_radius", display=False):
+    data = np.array(data, dtype=float)
+    instrumentation.count("survey.calc_well_path.stations", len(data), method=method)
+    # evaluate every station pair at once: row i-1 holds the segment i-1 -> i,
+    # with the station trigonometry and the dogleg shared by the DLS
+    with instrumentation.stage("survey.calc_well_path.segments", method=method):
+        terms = kernels.station_terms(*data.T)
+        segments = segments_from_terms(kernels.slice_terms(terms, slice(None, -1)),
+                                       kernels.slice_terms(terms, slice(1, None)), method)
+    with instrumentation.stage("survey.calc_well_path.cumsum"):
+        reach0 = np.sqrt(initial_pos[0]**2 + initial_pos[1]**2)
+        path = np.array(segments)
+        path[:,0] = initial_pos[0] + np.cumsum(path[:,0])  # Northing
+        path[:,1] = initial_pos[1] + np.cumsum(path[:,1])  # Easting
+        path[:,2] = initial_pos[2] + np.cumsum(path[:,2])  # Vertical
+        path[:,3] = reach0 + np.cumsum(path[:,3])  # Reach
     if display is True:
-        data_print = OrderedDict()
-        for i, (dx, dy, dz, dA, DLS) in enumerate(segments, 1):
-            real_path = path[i-1]
-            data_print[f"Segment {i}"] = {
-                "delta_North": np.round(dx,3),
-                "delta_East": np.round(dy,3),
-                "delta_Vertical": np.round(dz,3),
-                "delta_Reach": np.round(dA,3),
-                "N": np.round(real_path[0],3),
-                "E": np.round(real_path[1],3),
-                "TVD": np.round(real_path[2],3),
-                "Absolute Reach": np.round(real_path[3],3),
-                "Reach": np.round(real_path[3]*np.cos(target-data[i, 2]),3),
-                "Dogleg_Severity": np.round(DLS,3)
-
-            }
-        from pprint import pprint
-        pprint(data_print)
-    return segments, path
+        with instrumentation.stage("survey.calc_well_path.format"):
+            data_print = OrderedDict()
+            for i, (dx, dy, dz, dA, DLS) in enumerate(segments, 1):
+                real_path = path[i-1]
+                data_print[f"Segment {i}"] = {
+                    "delta_North": np.round(dx,3),
+                    "delta_East": np.round(dy,3),
+                    "delta_Vertical": np.round(dz,3),
+                    "delta_Reach": np.round(dA,3),
+                    "N": np.round(real_path[0],3),
+                    "E": np.round(real_path[1],3),
+                    "TVD": np.round(real_path[2],3),
+                    "Absolute Reach": np.round(real_path[3],3),
+                    "Reach": np.round(real_path[3]*np.cos(target-data[i, 2]),3),
+                    "Dogleg_Severity": np.round(DLS,3)
 
-def get_plot_projection_figs():
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-    # ax1: Vertical Section (Reach vs TVD)
-    ax1.set_xlabel('Reach (m)')
-    ax1.set_ylabel('TVD (m)')
-    ax1.set_title('Vertical Section')
-    ax1.invert_yaxis()  # TVD increases downwards
-
-    # ax2: Plan View (Easting vs Northing)
-    ax2.set_xlabel('Easting (m)')
-    ax2.set_ylabel('Northing (m)')
-    ax2.set_title('Plan View')
-
-    return ax1, ax2
-
-def get_plot3D_fig():
-    fig = plt.figure()
-    ax = fig.add_subplot(111, projection='3d')
-    ax.set_xlabel('Easting (m)')
-    ax.set_ylabel('Northing (m)')
-    ax.set_zlabel('TVD (m)')
-    ax.invert_zaxis()  # Invert Z axis to have TVD increasing downwards
-    return ax
+                }
+            from pprint import pprint
+            pprint(data_print)
+    return segments, path
 
 def DogLegSeverity(md1, inc1, azim1, md2, inc2, azim2):
     """"
-    calculate the dogleg severity based on the minimum curvature formula
+    calculate the dogleg severity based on the minimum curvature formula.
+    All arguments may also be arrays of station pairs, in which case the
+    dogleg severity is evaluated element-wise
 
     arguments:
     md1: float
@@ -92,26 +114,71 @@ def DogLegSeverity(md1, inc1, azim1, md2, inc2, azim2):
 
     returns:
 
-    float:
+    float or ndarray:
         Dogleg severity in degrees per 30 meters
     """
     dM = md2-md1
-    dinc = inc2-inc1
-    dazim = azim2-azim1
-    beta = 2*np.arcsin(
-                    np.sqrt(
-                        np.sin(0.5*dinc)**2 +
-                        np.sin(inc2)*np.sin(inc1)*np.sin(0.5*dazim)**2))
+    beta = kernels.dogleg(inc1, azim1, inc2, azim2)
 
     DLS = np.rad2deg(beta)/(dM/30)
     return DLS
 
 
+from . import batch
+from .batch import calc_well_paths
+from .trajectory import SurveyTrajectory
+from .compare import compare_methods
+from .md_index import TrajectoryIndex, resample_well_path
+from . import uncertainty
+from .uncertainty import station_covariances
+from . import anticollision
+from .anticollision import SegmentGrid
+from .pad_scan import scan_pad_separation
+from . import loader
+from .loader import load_survey_csv, load_survey_jsonl
+from . import store
+from .store import TrajectoryStore, write_trajectory_store
+from .cache import WellPathCache
+from . import decimation
+from .decimation import decimate_survey
+
+# plotting needs matplotlib, which is only imported on first use
+_PLOTTING = ("get_plot_projection_figs", "get_plot3D_fig", "plot_field")
+
+
+def __getattr__(name):
+    if name == "plotting" or name in _PLOTTING:
+        plotting = importlib.import_module(f"{__name__}.plotting")
+        return plotting if name == "plotting" else getattr(plotting, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
+    "kernels",
     "tangent",
      "balanced_tangent",
      "curvature_radius",
      "mean_angle",
      "min_curvature",
      "min_curvature_radius",
+     "batch",
+     "calc_well_paths",
+     "SurveyTrajectory",
+     "compare_methods",
+     "TrajectoryIndex",
+     "resample_well_path",
+     "uncertainty",
+     "station_covariances",
+     "anticollision",
+     "SegmentGrid",
+     "scan_pad_separation",
+     "loader",
+     "load_survey_csv",
+     "load_survey_jsonl",
+     "store",
+     "TrajectoryStore",
+     "write_trajectory_store",
+     "WellPathCache",
+     "decimation",
+     "decimate_survey",
     ]
\ No newline at end of file
@@ -0,0 +1,269 @@
+import numpy as np
+
+from .batch import _check_offsets
+
+# squared segment length below which a segment is treated as a point
+DEGENERATE_LENGTH = 1e-12
+
+
+def segment_distances(p1, q1, p2, q2):
+    """
+    closest approach between pairs of straight segments p1-q1 and p2-q2,
+    with the clamped closed form evaluated element-wise
+
+    arguments:
+    p1, q1: ndarray
+        (..., 3) end points of the first segments
+    p2, q2: ndarray
+        (..., 3) end points of the second segments
+
+    returns:
+
+    tuple: ndarray
+        distance, and the fractions s and t of the closest points along the
+        first and second segments
+    """
+    d1, d2, r = q1 - p1, q2 - p2, p1 - p2
+    a = np.sum(d1*d1, axis=-1)
+    e = np.sum(d2*d2, axis=-1)
+    b = np.sum(d1*d2, axis=-1)
+    c = np.sum(d1*r, axis=-1)
+    f = np.sum(d2*r, axis=-1)
+    point1 = a <= DEGENERATE_LENGTH
+    point2 = e <= DEGENERATE_LENGTH
+    safe_a = np.where(point1, 1, a)
+    safe_e = np.where(point2, 1, e)
+    denom = a*e - b*b
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # parallel segments take any s, the start of the first one is used
+        s = np.where(denom > DEGENERATE_LENGTH*a*e, np.clip((b*f - c*e)/denom, 0, 1), 0)
+    t = (b*s + f)/safe_e
+    s = np.where(t < 0, np.clip(-c/safe_a, 0, 1), np.where(t > 1, np.clip((b - c)/safe_a, 0, 1), s))
+    t = np.clip(t, 0, 1)
+    # one or both segments reduced to a point
+    s = np.where(point1, 0, np.where(point2, np.clip(-c/safe_a, 0, 1), s))
+    t = np.where(point2, 0, np.where(point1, np.clip(f/safe_e, 0, 1), t))
+    gap = p1 + s[..., None]*d1 - p2 - t[..., None]*d2
+    return np.sqrt(np.sum(gap*gap, axis=-1)), s, t
+
+
+def _cell_ranges(low, high, cell_size, origin, shape):
+    lower = np.clip(np.floor((low - origin)/cell_size).astype(np.int64), 0, shape - 1)
+    upper = np.clip(np.floor((high - origin)/cell_size).astype(np.int64), 0, shape - 1)
+    return lower, upper
+
+
+def _expand_cells(lower, upper, shape):
+    """flat cell index of every cell in each box, and the box it comes from"""
+    sizes = upper - lower + 1
+    counts = np.prod(sizes, axis=1)
+    box = np.repeat(np.arange(len(lower)), counts)
+    local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    sizes = sizes[box]
+    k = local % sizes[:, 2]
+    j = (local // sizes[:, 2]) % sizes[:, 1]
+    i = local // (sizes[:, 2]*sizes[:, 1])
+    cells = np.column_stack((i, j, k)) + lower[box]
+    return np.ravel_multi_index(cells.T, shape), box
+
+
+class SegmentGrid:
+    """
+    uniform grid over the segments of many wells for closest-approach and
+    anti-collision scans
+
+    Every segment (the chord between two stations) is registered in all the
+    cells its bounding box overlaps. A query only measures the segment
+    pairs that share a cell within the search radius, instead of all pairs.
+
+    arguments:
+    md: ndarray
+        flat measured depths of all wells
+    coordinates: ndarray
+        (N, 3) flat northing, easting and vertical of all stations
+    offsets: ndarray
+        (n_wells + 1) offsets, well w occupies the stations
+        offsets[w]:offsets[w+1], as in batch.pack_surveys
+    cell_size: float, optional
+        edge of the grid cells, defaults to the median segment length or
+        half the search radius, whichever is larger
+    radius: float, optional
+        search radius the grid is built for; with cells much smaller than
+        the radius, every query visits a very large number of cells
+    """
+
+    def __init__(self, md, coordinates, offsets, cell_size=None, radius=None):
+        self.md = np.asarray(md, dtype=float)
+        self.coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 3)
+        self.offsets = _check_offsets(offsets, len(self.md))
+        n = len(self.md)
+        valid = np.ones(max(n - 1, 0), dtype=bool)
+        valid[self.offsets[1:-1] - 1] = False
+        self.start = np.flatnonzero(valid)
+        self.well = np.searchsorted(self.offsets, self.start, side="right") - 1
+        p, q = self.coordinates[self.start], self.coordinates[self.start + 1]
+        self.default_cell_size = cell_size is None
+        if cell_size is None:
+            lengths = np.linalg.norm(q - p, axis=1)
+            cell_size = max(np.median(lengths) if len(lengths) else 1.,
+                            0.5*radius if radius is not None else 0.)
+        self.cell_size = float(max(cell_size, 1e-6))
+
+        low, high = np.minimum(p, q), np.maximum(p, q)
+        self.origin = low.min(axis=0) if len(low) else np.zeros(3)
+        self.shape = np.floor((high.max(axis=0) - self.origin)/self.cell_size).astype(np.int64) + 1 \
+            if len(high) else np.ones(3, dtype=np.int64)
+        cells, segment = _expand_cells(*_cell_ranges(low, high, self.cell_size, self.origin, self.shape),
+                                       self.shape)
+        order = np.argsort(cells, kind="stable")
+        self.cell_segments = segment[order]
+        self.cells, first = np.unique(cells[order], return_index=True)
+        self.cell_starts = np.append(first, len(order))
+
+    @classmethod
+    def from_wells(cls, wells, cell_size=None, radius=None):
+        """
+        build the grid from a sequence of (md, coordinates) pairs, one per
+        well, with coordinates as returned by
+        wellpath.calcCoordinatesFromSimplifiedData
+        """
+        mds = [np.asarray(md, dtype=float) for md, _ in wells]
+        coordinates = [np.asarray(xyz, dtype=float).reshape(-1, 3) for _, xyz in wells]
+        offsets = np.concatenate(([0], np.cumsum([len(md) for md in mds]))).astype(np.int64)
+        return cls(np.concatenate(mds), np.concatenate(coordinates), offsets, cell_size, radius)
+
+    @property
+    def n_wells(self):
+        return len(self.offsets) - 1
+
+    def candidates(self, p, q, radius):
+        """
+        segment pairs whose grid cells come within the search radius
+
+        arguments:
+        p, q: ndarray
+            (m, 3) end points of the query segments
+        radius: float
+            search radius
+
+        returns:
+
+        tuple: ndarray
+            query segment index and grid segment index of every unique pair
+        """
+        low = np.minimum(p, q) - radius
+        high = np.maximum(p, q) + radius
+        # boxes that miss the grid entirely would be clipped onto its border
+        inside = np.all((high >= self.origin) &
+                        (low <= self.origin + self.shape*self.cell_size), axis=1)
+        lower, upper = _cell_ranges(low[inside], high[inside], self.cell_size, self.origin, self.shape)
+        cells, box = _expand_cells(lower, upper, self.shape)
+        query = np.flatnonzero(inside)[box]
+        slot = np.searchsorted(self.cells, cells)
+        slot = np.minimum(slot, len(self.cells) - 1)
+        found = self.cells[slot] == cells if len(self.cells) else np.zeros(len(cells), dtype=bool)
+        query, slot = query[found], slot[found]
+        counts = self.cell_starts[slot + 1] - self.cell_starts[slot]
+        position = (np.repeat(self.cell_starts[slot] - np.cumsum(counts) + counts, counts) +
+                    np.arange(counts.sum()))
+        pairs = np.unique(np.repeat(query, counts)*len(self.start) + self.cell_segments[position])
+        return pairs // len(self.start), pairs % len(self.start)
+
+    def closest_approach(self, md, coordinates, radius, exclude=None):
+        """
+        closest approach of a reference well to every grid well within the
+        search radius, for each reference segment
+
+        arguments:
+        md: array-like
+            (n,) measured depths of the reference well
+        coordinates: array-like
+            (n, 3) northing, easting and vertical of the reference stations
+        radius: float
+            largest center to center distance reported
+        exclude: int or sequence of int, optional
+            grid wells left out of the scan (e.g. the reference well itself)
+
+        returns:
+
+        dict: ndarray
+            one entry per reference segment and offset well within the
+            radius, sorted by reference measured depth then well:
+            reference_md, offset_well, offset_md, distance,
+            reference_point and offset_point
+        """
+        md = np.asarray(md, dtype=float)
+        coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 3)
+        p, q = coordinates[:-1], coordinates[1:]
+        ref, seg = self.candidates(p, q, radius)
+        if exclude is not None:
+            keep = ~np.isin(self.well[seg], exclude)
+            ref, seg = ref[keep], seg[keep]
+        start = self.start[seg]
+        distance, s, t = segment_distances(p[ref], q[ref], self.coordinates[start],
+                                           self.coordinates[start + 1])
+        keep = distance <= radius
+        ref, seg, start, distance, s, t = (x[keep] for x in (ref, seg, start, distance, s, t))
+
+        # closest pair for every (reference segment, offset well)
+        well = self.well[seg]
+        order = np.lexsort((distance, well, ref))
+        key = ref[order]*self.n_wells + well[order]
+        change = np.ones(len(key), dtype=bool)
+        change[1:] = key[1:] != key[:-1]
+        first = order[change]
+        ref, start, distance, s, t, well = (x[first] for x in (ref, start, distance, s, t, well))
+        return {"reference_md": md[ref] + s*(md[ref + 1] - md[ref]),
+                "offset_well": well,
+                "offset_md": self.md[start] + t*(self.md[start + 1] - self.md[start]),
+                "distance": distance,
+                "reference_point": p[ref] + s[:, None]*(q[ref] - p[ref]),
+                "offset_point": (self.coordinates[start] + t[:, None]*
+                                 (self.coordinates[start + 1] - self.coordinates[start]))}
+
+
+def closest_per_well(report):
+    """
+    reduce a closest_approach report to the single closest point of every
+    offset well
+
+    arguments:
+    report: dict
+        as returned by SegmentGrid.closest_approach
+
+    returns:
+
+    dict: ndarray
+        the rows of the report with the lowest distance per offset well,
+        sorted by offset well
+    """
+    order = np.lexsort((report["distance"], report["offset_well"]))
+    well = report["offset_well"][order]
+    first = order[np.concatenate(([True], well[1:] != well[:-1]))] if len(well) else order
+    return {key: value[first] for key, value in report.items()}
+
+
+def scan_pad(grid, radius):
+    """
+    scan every well of a grid against all the others
+
+    arguments:
+    grid: SegmentGrid
+        grid holding all the wells of the pad; a grid with the default cell
+        size is rebuilt for the radius when its cells are too small
+    radius: float
+        largest center to center distance reported
+
+    returns:
+
+    list: dict
+        one closest_approach report per well, with the well itself excluded
+    """
+    if grid.default_cell_size and grid.cell_size < 0.5*radius:
+        grid = SegmentGrid(grid.md, grid.coordinates, grid.offsets, radius=radius)
+    reports = []
+    for w in range(grid.n_wells):
+        stations = slice(grid.offsets[w], grid.offsets[w + 1])
+        reports.append(grid.closest_approach(grid.md[stations], grid.coordinates[stations],
+                                             radius, exclude=w))
+    return reports
@@ -1,5 +1,7 @@
 import numpy as np
 
+from .kernels import station_terms, stack_segment
+
 def calc_segment(md1, inc1, azim1, md2, inc2, azim2):
     """
     calculate the positional increments of northing, easting, vertical and reach
@@ -30,3 +32,19 @@ def calc_segment(md1, inc1, azim1, md2, inc2, azim2):
     d_vertical = half_dMD * (np.cos(inc1) + np.cos(inc2))
     d_reach = half_dMD * (np.sin(inc1) + np.sin(inc2))
     return [d_north, d_east, d_vertical, d_reach]
+
+
+def calc_segments(md1, inc1, azim1, md2, inc2, azim2):
+    """vectorized calc_segment over arrays of station pairs, see kernels.segment_terms"""
+    return calc_segments_from_terms(station_terms(md1, inc1, azim1),
+                                    station_terms(md2, inc2, azim2))
+
+
+def calc_segments_from_terms(start, end, segment=None):
+    """balanced tangent segments: half the course length along the attitude of each station"""
+    half_dMD = 0.5 * (end["md"] - start["md"])
+    return stack_segment(
+        half_dMD * (start["sin_inc"] * start["cos_azim"] + end["sin_inc"] * end["cos_azim"]),
+        half_dMD * (start["sin_inc"] * start["sin_azim"] + end["sin_inc"] * end["sin_azim"]),
+        half_dMD * (start["cos_inc"] + end["cos_inc"]),
+        half_dMD * (start["sin_inc"] + end["sin_inc"]))
@@ -0,0 +1,142 @@
+import numpy as np
+
+from .. import instrumentation
+from . import kernels, segments_from_terms
+
+
+def pack_surveys(surveys):
+    """
+    pack a sequence of surveys into flat station arrays with per-well offsets
+
+    arguments:
+    surveys: sequence of array-like
+        one (n_i, 3) table of measured depth, inclination and azimuth
+        (radians) per well
+
+    returns:
+
+    tuple: ndarray
+        flat measured depth, inclination and azimuth arrays with all wells
+        concatenated, and the (n_wells + 1) offsets array where well w
+        occupies the stations offsets[w]:offsets[w+1]
+    """
+    tables = [np.asarray(survey, dtype=float).reshape(-1, 3) for survey in surveys]
+    counts = [len(table) for table in tables]
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+    data = np.concatenate(tables) if tables else np.zeros((0, 3))
+    return data[:, 0], data[:, 1], data[:, 2], offsets
+
+
+def split_by_offsets(values, offsets):
+    """
+    split a flat per-station (or per-segment) array back into one view per
+    well
+
+    arguments:
+    values: ndarray
+        flat array with the wells concatenated along the first axis
+    offsets: ndarray
+        (n_wells + 1) offsets into values
+
+    returns:
+
+    list: ndarray
+        one view of values per well
+    """
+    offsets = np.asarray(offsets)
+    return [values[offsets[w]:offsets[w+1]] for w in range(len(offsets) - 1)]
+
+
+def segmented_cumsum(values, offsets, initial=None):
+    """
+    cumulative sum along the first axis that restarts at every well
+
+    arguments:
+    values: ndarray
+        (N, ...) increments with the wells concatenated along the first axis
+    offsets: ndarray
+        (n_wells + 1) offsets into values
+    initial: array-like, optional
+        value added to the cumulative sum of each well, shape (n_wells, ...)
+
+    returns:
+
+    ndarray: float
+        (N, ...) per-well cumulative sums
+    """
+    values = np.asarray(values, dtype=float)
+    offsets = np.asarray(offsets)
+    counts = np.diff(offsets)
+    total = np.cumsum(values, axis=0)
+    # running total reached before the first row of each well
+    before = np.concatenate((np.zeros((1,) + values.shape[1:]), total))
+    result = total - np.repeat(before[offsets[:-1]], counts, axis=0)
+    if initial is not None:
+        initial = np.broadcast_to(np.asarray(initial, dtype=float),
+                                  (len(counts),) + values.shape[1:])
+        result += np.repeat(initial, counts, axis=0)
+    return result
+
+
+def _check_offsets(offsets, n_stations):
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if offsets.ndim != 1 or len(offsets) < 2:
+        raise ValueError("offsets must hold at least the start and end of one well")
+    if offsets[0] != 0 or offsets[-1] != n_stations:
+        raise ValueError("offsets must start at 0 and end at the number of stations")
+    if np.any(np.diff(offsets) < 1):
+        raise ValueError("every well must have at least one station")
+    return offsets
+
+
+def calc_well_paths(md, inc, azim, offsets, initial_pos=None, method="min_curvature_radius"):
+    """
+    batch version of calc_well_path for many wells packed into flat arrays
+
+    arguments:
+    md, inc, azim: ndarray
+        flat measured depth, inclination and azimuth (radians) of all wells
+    offsets: ndarray
+        (n_wells + 1) offsets, well w occupies the stations
+        offsets[w]:offsets[w+1]
+    initial_pos: array-like, optional
+        (n_wells, 3) northing, easting and vertical position of the first
+        station of each well (default: origin)
+    method: str
+        survey method name, as in calc_well_path
+
+    returns:
+
+    tuple: ndarray
+        segments (M, 5) with the increments and dogleg severity of every
+        segment, path (M, 4) with the per-well cumulative northing, easting,
+        vertical and reach, and the (n_wells + 1) segment offsets. Each well
+        contributes one row less than its number of stations, exactly as
+        calc_well_path does
+    """
+    md = np.asarray(md, dtype=float)
+    inc = np.asarray(inc, dtype=float)
+    azim = np.asarray(azim, dtype=float)
+    offsets = _check_offsets(offsets, len(md))
+    n_wells = len(offsets) - 1
+    if initial_pos is None:
+        initial_pos = np.zeros((n_wells, 3))
+    initial_pos = np.broadcast_to(np.asarray(initial_pos, dtype=float), (n_wells, 3))
+
+    # pair j joins stations j and j+1; drop the pairs that straddle two wells
+    valid = np.ones(max(len(md) - 1, 0), dtype=bool)
+    valid[offsets[1:-1] - 1] = False
+    pair = np.flatnonzero(valid)
+    instrumentation.count("survey.calc_well_paths.stations", len(md), method=method, wells=n_wells)
+    with instrumentation.stage("survey.calc_well_paths.segments", method=method):
+        terms = kernels.station_terms(md, inc, azim)
+        segments = segments_from_terms(kernels.slice_terms(terms, pair),
+                                       kernels.slice_terms(terms, pair + 1), method)
+    segment_offsets = offsets - np.arange(n_wells + 1)
+
+    with instrumentation.stage("survey.calc_well_paths.cumsum"):
+        reach0 = np.sqrt(initial_pos[:, 0]**2 + initial_pos[:, 1]**2)
+        path = np.array(segments)
+        path[:, :4] = segmented_cumsum(segments[:, :4], segment_offsets,
+                                       np.column_stack((initial_pos, reach0)))
+    return segments, path, segment_offsets
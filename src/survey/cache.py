@@ -0,0 +1,247 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from . import calc_well_path
+from .wellpath import calcCoordinatesFromSimplifiedData
+
+# part of every key: bump it whenever a change to the survey kernels changes
+# their results, so that results written to disk before it are not served
+CACHE_VERSION = 1
+
+
+def survey_key(kind, arrays, method, initial_pos):
+    """
+    content hash of a computation: the cache version, the station arrays
+    (as float64 bytes and shape), the method name and the initial position
+
+    arguments:
+    kind: str
+        name of the cached function
+    arrays: sequence of array-like
+        station arrays
+    method: str
+        survey method name
+    initial_pos: array-like
+        initial position
+
+    returns:
+
+    str:
+        hex digest
+    """
+    digest = hashlib.sha256(f"{CACHE_VERSION}:{kind}".encode())
+    for array in arrays:
+        array = np.ascontiguousarray(array, dtype="<f8")
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    digest.update(str(method).encode())
+    digest.update(np.ascontiguousarray(initial_pos, dtype="<f8").tobytes())
+    return digest.hexdigest()
+
+
+def _frozen(arrays):
+    for array in arrays:
+        array.flags.writeable = False
+    return arrays
+
+
+class WellPathCache:
+    """
+    content-addressed cache for calc_well_path and
+    calcCoordinatesFromSimplifiedData results
+
+    Results live in a bounded in-memory LRU tier and, when a directory is
+    given, in an on-disk tier of .npz files that survives restarts and is
+    shared between processes. Returned arrays are read-only because every
+    hit shares them.
+
+    arguments:
+    max_entries: int
+        number of results kept in memory
+    directory: str or path, optional
+        directory of the on-disk tier
+    """
+
+    def __init__(self, max_entries=128, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self._memory = OrderedDict()
+        self._tags = {}
+        # tags of every key, to prune _tags when a key leaves the cache
+        self._key_tags = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._memory)
+
+    def __contains__(self, key):
+        return key in self._memory or (self._path(key) is not None and os.path.exists(self._path(key)))
+
+    def _path(self, key):
+        if self.directory is None:
+            return None
+        return os.path.join(self.directory, key + ".npz")
+
+    def _store(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            evicted, _ = self._memory.popitem(last=False)
+            self.evictions += 1
+            if self.directory is None:
+                # without a disk tier the result is gone, and so are its tags;
+                # with one, the tags still locate its file for invalidate
+                self._untag([evicted])
+
+    def _untag(self, keys):
+        for key in keys:
+            for tag in self._key_tags.pop(key, ()):
+                names = self._tags.get(tag)
+                if names is not None:
+                    names.discard(key)
+                    if not names:
+                        del self._tags[tag]
+
+    def _load(self, key):
+        path = self._path(key)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                names = sorted(data.files, key=lambda name: int(name[4:]))
+                return _frozen(tuple(data[name] for name in names))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save(self, key, value):
+        path = self._path(key)
+        if path is None:
+            return
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as handle:
+            np.savez(handle, **{f"arr_{i}": array for i, array in enumerate(value)})
+        os.replace(temporary, path)
+
+    def get_or_compute(self, key, compute, tag=None):
+        """
+        look a result up in memory, then on disk, and compute and store it
+        on a miss
+
+        arguments:
+        key: str
+            content hash, see survey_key
+        compute: callable
+            returns the result as a tuple of arrays
+        tag: hashable, optional
+            label (e.g. the well id) used by invalidate
+
+        returns:
+
+        tuple: ndarray
+            the read-only result arrays
+        """
+        if tag is not None:
+            self._tags.setdefault(tag, set()).add(key)
+            self._key_tags.setdefault(key, set()).add(tag)
+        value = self._memory.get(key)
+        if value is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return value
+        value = self._load(key)
+        if value is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            value = _frozen(tuple(np.asarray(array) for array in compute()))
+            self._save(key, value)
+        self._store(key, value)
+        return value
+
+    def calc_well_path(self, data, initial_pos=[0, 0, 0], method="min_curvature_radius", tag=None):
+        """
+        cached calc_well_path
+
+        arguments:
+        data, initial_pos, method:
+            as in calc_well_path
+        tag: hashable, optional
+            label (e.g. the well id) used by invalidate
+
+        returns:
+
+        tuple: ndarray
+            read-only segments and path
+        """
+        data = np.asarray(data, dtype=float)
+        key = survey_key("calc_well_path", [data], method, initial_pos)
+        return self.get_or_compute(key, lambda: calc_well_path(data, initial_pos, method=method), tag)
+
+    def calc_coordinates(self, measured_depth, inclination, azimuth, start_point, tag=None):
+        """
+        cached calcCoordinatesFromSimplifiedData
+
+        returns:
+
+        ndarray:
+            read-only (n, 3) coordinates
+        """
+        key = survey_key("calcCoordinatesFromSimplifiedData",
+                         [measured_depth, inclination, azimuth], "min_curvature", start_point)
+        return self.get_or_compute(key, lambda: (calcCoordinatesFromSimplifiedData(
+            measured_depth, inclination, azimuth, start_point),), tag)[0]
+
+    def invalidate(self, tag=None, key=None):
+        """
+        drop cached results from both tiers, e.g. when a station is appended
+        to a well
+
+        arguments:
+        tag: hashable, optional
+            drop every result stored under this tag
+        key: str, optional
+            drop one result by its content hash
+
+        returns:
+
+        int:
+            number of results dropped
+        """
+        keys = set(self._tags.pop(tag, ())) if tag is not None else set()
+        if key is not None:
+            keys.add(key)
+        dropped = 0
+        for name in keys:
+            found = self._memory.pop(name, None) is not None
+            path = self._path(name)
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+                found = True
+            dropped += found
+        self._untag(keys)
+        return dropped
+
+    def clear(self):
+        """drop the in-memory tier and reset the statistics"""
+        self._memory.clear()
+        self._tags.clear()
+        self._key_tags.clear()
+        self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """hits, disk_hits, misses, evictions, entries and hit_rate"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {"hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._memory),
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.}
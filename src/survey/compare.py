@@ -0,0 +1,62 @@
+import numpy as np
+
+from . import SEGMENT_METHODS, TERM_METHODS, kernels
+
+
+def compare_methods(data, initial_pos=[0, 0, 0], methods=None, reference="min_curvature_radius"):
+    """
+    run several survey methods on the same survey in one pass. The sin/cos
+    of inclination and azimuth are computed once per station and the
+    dogleg and mean angles once per segment, then shared by every method
+
+    arguments:
+    data: array-like
+        (n, 3) table of measured depth, inclination and azimuth (radians)
+    initial_pos: array-like
+        northing, easting and vertical position of the first station
+    methods: sequence of str, optional
+        survey method names to evaluate (default: all of them)
+    reference: str
+        method the differences are taken against
+
+    returns:
+
+    dict:
+        methods: tuple with the method names, in stacking order
+        segments: (method, station, 5) segments laid out as in calc_well_path
+        paths: (method, station, 5) paths laid out as in calc_well_path
+        differences: (method, station, 4) path northing, easting, vertical
+            and reach minus those of the reference method
+    """
+    methods = tuple(SEGMENT_METHODS) if methods is None else tuple(methods)
+    for method in methods + (reference,):
+        if method not in TERM_METHODS:
+            raise ValueError(f"Method '{method}' is not recognized.")
+    data = np.array(data, dtype=float)
+    initial_pos = np.asarray(initial_pos, dtype=float)
+
+    terms = kernels.station_terms(*data.T)
+    start = kernels.slice_terms(terms, slice(None, -1))
+    end = kernels.slice_terms(terms, slice(1, None))
+    segment = kernels.segment_terms(start, end)
+    DLS = np.rad2deg(segment["dogleg"])/((end["md"] - start["md"])/30)
+
+    n_segments = max(len(data) - 1, 0)
+    segments = np.empty((len(methods), n_segments, 5))
+    for i, method in enumerate(methods):
+        segments[i, :, :4] = TERM_METHODS[method](start, end, segment)
+    segments[:, :, 4] = DLS
+
+    reach0 = np.sqrt(initial_pos[0]**2 + initial_pos[1]**2)
+    paths = np.array(segments)
+    paths[:, :, :4] = (np.concatenate((initial_pos, [reach0])) +
+                       np.cumsum(segments[:, :, :4], axis=1))
+    if reference in methods:
+        reference_path = paths[methods.index(reference), :, :4]
+    else:
+        reference_path = (np.concatenate((initial_pos, [reach0])) +
+                          np.cumsum(TERM_METHODS[reference](start, end, segment), axis=0))
+    return {"methods": methods,
+            "segments": segments,
+            "paths": paths,
+            "differences": paths[:, :, :4] - reference_path}
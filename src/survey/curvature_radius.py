@@ -1,5 +1,7 @@
 import numpy as np
 
+from .kernels import mean_terms, station_terms, stack_segment
+
 
 def calc_segment_mitchell(md1, inc1, azim1, md2, inc2, azim2):
     """"
@@ -66,22 +68,33 @@ def calc_segment(md1, inc1, azim1, md2, inc2, azim2):
     list: float
         A list with the lengths dx, dy and dz of the segment
     """
-    dM = md2-md1
-    dinc = inc2-inc1
-    dazim = azim2-azim1
-    np
-    dN = dM * (((np.cos(inc1) - np.cos(inc2)) / dinc)) * ((np.sin(azim2) - np.sin(azim1)) / dazim)
-    dE = dM * (((np.cos(inc1) - np.cos(inc2)) / dinc)) * ((np.cos(azim1) - np.cos(azim2)) / dazim)
-    dTVD = dM * (np.sin(inc2) - np.sin(inc1)) / dinc
-    d_reach = dM * (np.cos(inc1) - np.cos(inc2)) / dinc
-
-    dx = dN
-    dy = dE
-    dz = dTVD
-    d_reach = d_reach
+    # components on the last axis, so that array inputs unpack per component
+    dx, dy, dz, d_reach = np.moveaxis(calc_segments(md1, inc1, azim1, md2, inc2, azim2), -1, 0)
     return [dx, dy, dz, d_reach]
 
 
+def calc_segments(md1, inc1, azim1, md2, inc2, azim2):
+    """vectorized calc_segment over arrays of station pairs, see kernels.segment_terms"""
+    return calc_segments_from_terms(station_terms(md1, inc1, azim1),
+                                    station_terms(md2, inc2, azim2))
+
+
+def calc_segments_from_terms(start, end, segment=None):
+    """curvature radius segments: vertical and plan circular arcs via the sinc of the half changes"""
+    mean = mean_terms(start, end) if segment is None else segment
+    dM = end["md"] - start["md"]
+    # (cos(inc1) - cos(inc2)) / dinc and (sin(inc2) - sin(inc1)) / dinc, and
+    # the same ratios for azimuth, without dividing by a zero angle change
+    cos_ratio_inc = mean["sin_inc"] * mean["sinc_inc"]
+    sin_ratio_inc = mean["cos_inc"] * mean["sinc_inc"]
+    cos_ratio_azim = mean["sin_azim"] * mean["sinc_azim"]
+    sin_ratio_azim = mean["cos_azim"] * mean["sinc_azim"]
+    return stack_segment(dM * cos_ratio_inc * sin_ratio_azim,
+                         dM * cos_ratio_inc * cos_ratio_azim,
+                         dM * sin_ratio_inc,
+                         dM * cos_ratio_inc)
+
+
 
 
 # def min_curvature_survey(md, inc, azim):
\ No newline at end of file
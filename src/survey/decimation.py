@@ -0,0 +1,318 @@
+import numpy as np
+
+from .batch import _check_offsets
+from .kernels import sinc, station_terms
+from .md_index import unit_tangent
+from .wellpath import calcCoordinatesFromSimplifiedBatch
+
+
+def point_segment_distances(points, start, end):
+    """
+    distance from every point to the segment start-end of the same row
+
+    arguments:
+    points, start, end: ndarray
+        (n, k) points and segment end points, in any dimension k
+
+    returns:
+
+    ndarray: float
+        (n,) distances
+    """
+    direction = end - start
+    offset = points - start
+    length2 = np.einsum("...i,...i->...", direction, direction)
+    along = np.einsum("...i,...i->...", offset, direction)
+    fraction = np.clip(np.divide(along, length2, out=np.zeros_like(along), where=length2 > 0), 0, 1)
+    offset -= fraction[..., None]*direction
+    return np.sqrt(np.einsum("...i,...i->...", offset, offset))
+
+
+def split_intervals(offsets, tolerance, deviation):
+    """
+    Ramer-Douglas-Peucker splitting of many lines at once: every pass
+    measures the interior points of all open intervals of all lines in one
+    array operation and splits each interval at its farthest point while
+    its deviation exceeds the tolerance
+
+    arguments:
+    offsets: ndarray
+        (n_lines + 1) offsets, line w occupies the points
+        offsets[w]:offsets[w+1]
+    tolerance: float
+        largest deviation left in an interval
+    deviation: callable
+        deviation(index, interval, first, last) returns the deviation of
+        the interior points index, which belong to the intervals interval,
+        from the approximation between the points first and last of every
+        interval, and an optional deviation per interval (e.g. at its last
+        point) or None
+
+    returns:
+
+    ndarray: bool
+        (N,) mask of the kept points; the first and last point of every
+        line are always kept
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    keep = np.zeros(offsets[-1], dtype=bool)
+    keep[offsets[:-1]] = True
+    keep[offsets[1:] - 1] = True
+    first, last = offsets[:-1], offsets[1:] - 1
+    while True:
+        open_ = last - first > 1
+        first, last = first[open_], last[open_]
+        if not len(first):
+            return keep
+        counts = last - first - 1
+        interval = np.repeat(np.arange(len(first)), counts)
+        index = (np.repeat(first + 1 - np.cumsum(counts) + counts, counts) +
+                 np.arange(counts.sum()))
+        distance, extra = deviation(index, interval, first, last)
+        # farthest interior point of every interval
+        starts = np.cumsum(counts) - counts
+        farthest = np.maximum.reduceat(distance, starts)
+        split = farthest > tolerance
+        halve = np.zeros_like(split) if extra is None else extra > tolerance
+        # an interval whose own deviation fails is halved instead: its
+        # interior deviation then grows towards the last point, and splitting
+        # at the farthest point would peel it one point per pass
+        split &= ~halve
+        candidate = np.flatnonzero((distance == farthest[interval]) & split[interval])
+        middle = index[candidate[np.unique(interval[candidate], return_index=True)[1]]]
+        if halve.any():
+            middle = np.concatenate((middle, (first[halve] + last[halve]) // 2))
+            first, last = (np.concatenate((first[split], first[halve])),
+                           np.concatenate((last[split], last[halve])))
+            split = np.ones(len(first), dtype=bool)
+        keep[middle] = True
+        first, last = (np.concatenate((first[split], middle)),
+                       np.concatenate((middle, last[split])))
+
+
+def rdp_mask(points, offsets, tolerance):
+    """
+    Ramer-Douglas-Peucker decimation of many polylines at once, see
+    split_intervals
+
+    arguments:
+    points: ndarray
+        (N, k) flat points of all polylines
+    offsets: ndarray
+        (n_lines + 1) offsets, line w occupies the points
+        offsets[w]:offsets[w+1]
+    tolerance: float
+        largest distance between a dropped point and the decimated line
+
+    returns:
+
+    ndarray: bool
+        (N,) mask of the kept points
+    """
+    points = np.asarray(points, dtype=float)
+    offsets = _check_offsets(offsets, len(points))
+
+    def chord_distance(index, interval, first, last):
+        return point_segment_distances(points[index], points[first[interval]],
+                                       points[last[interval]]), None
+    return split_intervals(offsets, tolerance, chord_distance)
+
+
+def grid_mask(points, offsets, cell_size):
+    """
+    keep only the first and last point of every run of consecutive points
+    that fall in the same grid cell, so that every dropped point lies within
+    one cell diagonal of the line through the kept points
+
+    arguments:
+    points: ndarray
+        (N, k) flat points of all polylines
+    offsets: ndarray
+        (n_lines + 1) offsets of the lines
+    cell_size: float
+        edge of the grid cells
+
+    returns:
+
+    ndarray: bool
+        (N,) mask of the kept points
+    """
+    points = np.asarray(points, dtype=float)
+    offsets = _check_offsets(offsets, len(points))
+    cells = np.floor(points/cell_size)
+    change = np.any(cells[1:] != cells[:-1], axis=1)
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:-1] = change[:-1] | change[1:]
+    keep[offsets[:-1]] = True
+    keep[offsets[1:] - 1] = True
+    return keep
+
+
+def screen_mask(points, offsets, tolerance):
+    """
+    decimate many polylines in screen space: a grid pass drops the points
+    sharing a cell with their neighbours, then rdp_mask runs on the rest.
+    The grid cell and the RDP tolerance split the budget so that no dropped
+    point lies farther than tolerance from the decimated line
+
+    arguments:
+    points: ndarray
+        (N, k) flat points of all polylines, in pixels
+    offsets: ndarray
+        (n_lines + 1) offsets of the lines
+    tolerance: float
+        largest distance between a dropped point and the decimated line
+
+    returns:
+
+    ndarray: bool
+        (N,) mask of the kept points
+    """
+    points = np.asarray(points, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    cell_size = 0.5*tolerance/np.sqrt(points.shape[1])
+    keep = grid_mask(points, offsets, cell_size)
+    kept = np.flatnonzero(keep)
+    counts = np.add.reduceat(keep, offsets[:-1])
+    fine = rdp_mask(points[kept], np.concatenate(([0], np.cumsum(counts))), 0.5*tolerance)
+    keep[kept[~fine]] = False
+    return keep
+
+
+def decimate(points, offsets, tolerance):
+    """
+    decimate many polylines, see rdp_mask
+
+    returns:
+
+    tuple: ndarray
+        kept points, their (n_lines + 1) offsets and the mask of the kept
+        points
+    """
+    keep = rdp_mask(points, offsets, tolerance)
+    counts = np.add.reduceat(keep, np.asarray(offsets)[:-1]) if len(keep) else np.zeros(0, int)
+    return (np.asarray(points)[keep],
+            np.concatenate(([0], np.cumsum(counts))).astype(np.int64), keep)
+
+
+def arc_offsets(t_start, t_end, length, fraction):
+    """
+    position on minimum curvature arcs relative to their start, at a
+    fraction of their length
+
+    arguments:
+    t_start, t_end: ndarray
+        (n, 3) unit tangents at both ends of every arc
+    length: ndarray
+        (n,) measured depth length of every arc
+    fraction: ndarray
+        (n,) fraction of the length of every query point
+
+    returns:
+
+    ndarray: float
+        (n, 3) offsets from the start of every arc
+    """
+    chord = np.linalg.norm(t_end - t_start, axis=-1)
+    beta = 2*np.arcsin(np.clip(0.5*chord, 0, 1))
+    # beta times the unit normal of the arc plane, finite on straight arcs
+    w = (t_end - np.cos(beta)[:, None]*t_start)/sinc(beta)[:, None]
+    f = fraction[:, None]
+    along = f*sinc(beta*fraction)[:, None]
+    return length[:, None]*(along*t_start + 0.5*f**2*sinc(0.5*beta*fraction)[:, None]**2*w)
+
+
+def _rebuilt_deviation(md, inc, azim, offsets, start_points, positions, tangents, keep):
+    """distance between the original stations and the path rebuilt from the kept stations"""
+    kept = np.flatnonzero(keep)
+    kept_offsets = np.concatenate(([0], np.cumsum(np.add.reduceat(keep, offsets[:-1]))))
+    rebuilt = calcCoordinatesFromSimplifiedBatch(md[kept], inc[kept], azim[kept],
+                                                 kept_offsets, start_points)
+    previous = np.cumsum(keep) - 1
+    points = rebuilt[previous].copy()
+    dropped = np.flatnonzero(~keep)
+    # every well keeps its last station, so a dropped station has a kept successor
+    before, after = kept[previous[dropped]], kept[previous[dropped] + 1]
+    length = md[after] - md[before]
+    points[dropped] += arc_offsets(tangents[before], tangents[after], length,
+                                   (md[dropped] - md[before])/length)
+    return np.linalg.norm(points - positions, axis=1)
+
+
+def decimate_survey(md, inc, azim, tolerance, offsets=None, start_points=None, max_iterations=12):
+    """
+    drop the survey stations whose removal moves the minimum curvature path
+    by less than a tolerance, for dense gyro and continuous surveys
+
+    Stations are chosen by Ramer-Douglas-Peucker splitting
+    (split_intervals), with the deviation of an interval measured between
+    the original stations and the minimum curvature arc joining its ends,
+    including the end point. Because the position errors of successive
+    intervals add up along the well, the path rebuilt from the kept
+    stations is then compared with the original at every station, and the
+    interval tolerance is tightened until the true deviation fits
+
+    arguments:
+    md, inc, azim: ndarray
+        measured depth, inclination and azimuth (radians), flat for many
+        wells when offsets is given
+    tolerance: float
+        largest position change allowed at any original station
+    offsets: ndarray, optional
+        (n_wells + 1) offsets of the wells, as in batch.pack_surveys
+    start_points: array-like, optional
+        (n_wells, 3) coordinates of the first stations (default: origin)
+    max_iterations: int
+        largest number of splittings, each with a tighter tolerance
+
+    returns:
+
+    dict:
+        mask (kept stations), measured_depth, inclination, azimuth and
+        offsets of the decimated survey, deviation (position change at every
+        original station), max_deviation, interval_tolerance (the
+        tolerance used by the splitting that produced mask) and converged,
+        False when max_iterations ran out before max_deviation fell within
+        tolerance
+    """
+    md = np.asarray(md, dtype=float)
+    inc = np.asarray(inc, dtype=float)
+    azim = np.asarray(azim, dtype=float)
+    offsets = _check_offsets([0, len(md)] if offsets is None else offsets, len(md))
+    n_wells = len(offsets) - 1
+    start_points = np.broadcast_to(np.zeros(3) if start_points is None else
+                                   np.asarray(start_points, dtype=float), (n_wells, 3))
+    positions = calcCoordinatesFromSimplifiedBatch(md, inc, azim, offsets, start_points)
+    tangents = unit_tangent(station_terms(md, inc, azim))
+
+    def arc_deviation(index, interval, first, last):
+        length = md[last] - md[first]
+        # the end of the arc moves every later station of the well
+        end = positions[first] + arc_offsets(tangents[first], tangents[last], length,
+                                             np.ones(len(first)))
+        points = positions[first[interval]] + arc_offsets(
+            tangents[first[interval]], tangents[last[interval]], length[interval],
+            (md[index] - md[first[interval]])/length[interval])
+        return (np.linalg.norm(points - positions[index], axis=1),
+                np.linalg.norm(end - positions[last], axis=1))
+
+    interval_tolerance = tolerance
+    for iteration in range(max(max_iterations, 1)):
+        if iteration:
+            interval_tolerance *= 0.5*tolerance/max_deviation
+        keep = split_intervals(offsets, interval_tolerance, arc_deviation)
+        deviation = _rebuilt_deviation(md, inc, azim, offsets, start_points, positions,
+                                       tangents, keep)
+        max_deviation = float(deviation.max()) if len(deviation) else 0.
+        if max_deviation <= tolerance:
+            break
+    counts = np.add.reduceat(keep, offsets[:-1])
+    return {"mask": keep,
+            "measured_depth": md[keep],
+            "inclination": inc[keep],
+            "azimuth": azim[keep],
+            "offsets": np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+            "deviation": deviation,
+            "max_deviation": max_deviation,
+            "interval_tolerance": interval_tolerance,
+            "converged": max_deviation <= tolerance}
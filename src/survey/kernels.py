@@ -0,0 +1,182 @@
+import numpy as np
+
+# below this angle (radians) the closed forms are replaced by their series
+# expansions, which are exact to machine precision there
+SERIES_THRESHOLD = 1e-4
+
+
+def dogleg(inc1, azim1, inc2, azim2):
+    """
+    calculate the dogleg (total angle change) between two survey stations
+    with the haversine form of the minimum curvature formula, which stays
+    accurate for straight holds where the arccos form loses precision
+
+    arguments:
+    inc1, azim1: float or ndarray
+        inclination and azimuth at point 1 (radians)
+    inc2, azim2: float or ndarray
+        inclination and azimuth at point 2 (radians)
+
+    returns:
+
+    float or ndarray:
+        dogleg angle in radians
+    """
+    half_chord = (np.sin(0.5*(inc2-inc1))**2 +
+                  np.sin(inc1)*np.sin(inc2)*np.sin(0.5*(azim2-azim1))**2)
+    return 2*np.arcsin(np.sqrt(np.clip(half_chord, 0, 1)))
+
+
+def ratio_factor(beta):
+    """
+    calculate the minimum curvature ratio factor tan(beta/2)/(beta/2),
+    using its series expansion 1 + beta^2/12 + beta^4/120 for straight
+    and nearly straight segments
+
+    arguments:
+    beta: float or ndarray
+        dogleg angle in radians
+
+    returns:
+
+    float or ndarray:
+        ratio factor, equal to 1 for a straight segment
+    """
+    beta = np.asarray(beta, dtype=float)
+    small = np.abs(beta) < SERIES_THRESHOLD
+    half = 0.5*np.where(small, 1, beta)
+    beta2 = beta**2
+    return np.where(small, 1 + beta2/12 + beta2**2/120, np.tan(half)/half)
+
+
+def sinc(x):
+    """
+    calculate sin(x)/x, equal to 1 at x = 0
+
+    arguments:
+    x: float or ndarray
+        angle in radians
+
+    returns:
+
+    float or ndarray:
+        sin(x)/x
+    """
+    return np.sinc(np.asarray(x, dtype=float)/np.pi)
+
+
+def station_terms(md, inc, azim):
+    """
+    precompute the trigonometric terms of survey stations so that every
+    survey method can share them
+
+    arguments:
+    md: float or ndarray
+        measured depth
+    inc: float or ndarray
+        inclination with respect to vertical (radians)
+    azim: float or ndarray
+        azimuth with respect to north (radians)
+
+    returns:
+
+    dict: ndarray
+        md, inc, azim and their sin_inc, cos_inc, sin_azim and cos_azim
+    """
+    inc = np.asarray(inc, dtype=float)
+    azim = np.asarray(azim, dtype=float)
+    return {"md": np.asarray(md, dtype=float),
+            "inc": inc,
+            "azim": azim,
+            "sin_inc": np.sin(inc),
+            "cos_inc": np.cos(inc),
+            "sin_azim": np.sin(azim),
+            "cos_azim": np.cos(azim)}
+
+
+def slice_terms(terms, index):
+    """select the same stations from every array of a terms dict"""
+    return {key: value[index] for key, value in terms.items()}
+
+
+def dogleg_from_terms(start, end):
+    """
+    calculate the dogleg between two stations from their precomputed terms,
+    as twice the arcsine of half the chord between the unit tangents. The
+    chord form keeps full absolute precision on straight holds
+
+    arguments:
+    start, end: dict
+        station terms of point 1 and point 2
+
+    returns:
+
+    float or ndarray:
+        dogleg angle in radians
+    """
+    d_north = end["sin_inc"]*end["cos_azim"] - start["sin_inc"]*start["cos_azim"]
+    d_east = end["sin_inc"]*end["sin_azim"] - start["sin_inc"]*start["sin_azim"]
+    d_vertical = end["cos_inc"] - start["cos_inc"]
+    chord = np.sqrt(d_north**2 + d_east**2 + d_vertical**2)
+    return 2*np.arcsin(np.clip(0.5*chord, 0, 1))
+
+
+def mean_terms(start, end):
+    """
+    calculate the mean-angle terms of a segment. Besides the sin/cos of the
+    mean inclination and azimuth, sinc_inc and sinc_azim are sinc of the
+    half changes, which give the curvature radius ratios
+
+        (cos(a1) - cos(a2)) / (a2 - a1) = sin(m) * sinc(h)
+        (sin(a2) - sin(a1)) / (a2 - a1) = cos(m) * sinc(h)
+
+    without dividing by a zero angle change
+
+    arguments:
+    start, end: dict
+        station terms of point 1 and point 2
+
+    returns:
+
+    dict: ndarray
+        sin_inc, cos_inc, sin_azim, cos_azim, sinc_inc and sinc_azim
+    """
+    mean_inc = 0.5*(start["inc"] + end["inc"])
+    mean_azim = 0.5*(start["azim"] + end["azim"])
+    return {"sin_inc": np.sin(mean_inc),
+            "cos_inc": np.cos(mean_inc),
+            "sin_azim": np.sin(mean_azim),
+            "cos_azim": np.cos(mean_azim),
+            "sinc_inc": sinc(0.5*(end["inc"] - start["inc"])),
+            "sinc_azim": sinc(0.5*(end["azim"] - start["azim"]))}
+
+
+def segment_terms(start, end):
+    """
+    calculate every per-segment term used by the survey methods: the
+    dogleg and the mean-angle terms
+
+    every survey method module exposes
+    calc_segments_from_terms(start, end, segment=None), where start and end
+    are station_terms of point 1 and point 2 and segment is this dict (or
+    any dict holding the keys the method reads), computed from start and
+    end when omitted. it returns an (..., 4) array of north, east, vertical
+    and reach; calc_segments is the same from raw station arrays in radians.
+
+    arguments:
+    start, end: dict
+        station terms of point 1 and point 2
+
+    returns:
+
+    dict: ndarray
+        dogleg plus the keys of mean_terms
+    """
+    terms = mean_terms(start, end)
+    terms["dogleg"] = dogleg_from_terms(start, end)
+    return terms
+
+
+def stack_segment(*components):
+    """stack segment components into an (..., k) array"""
+    return np.stack(np.broadcast_arrays(*components), axis=-1)
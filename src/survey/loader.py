@@ -0,0 +1,250 @@
+import json
+from itertools import islice
+
+import numpy as np
+
+from .wellpath import calcCoordinatesFromSimplifiedBatch
+
+# column names of the Hydra survey exports, as read by serializeFromHydra
+MD_COLUMN = "measuredDepth"
+INC_COLUMN = "inclination"
+AZIM_COLUMN = "azimuth"
+
+
+def _open(source):
+    if hasattr(source, "read"):
+        return source, False
+    return open(source, "r", newline=""), True
+
+
+def iter_csv_chunks(source, well_column="well", md_column=MD_COLUMN, inc_column=INC_COLUMN,
+                    azim_column=AZIM_COLUMN, delimiter=",", chunk_size=100000):
+    """
+    stream a long-format survey CSV (one row per station, many wells per
+    file) as typed column chunks
+
+    arguments:
+    source: path or text file object
+        CSV file with a header row
+    well_column, md_column, inc_column, azim_column: str
+        header names of the well name, measured depth, inclination and
+        azimuth columns
+    delimiter: str
+        field separator; fields may be quoted with double quotes, so that
+        "A-1" and A-1 name the same well
+    chunk_size: int
+        number of rows parsed at a time
+
+    returns:
+
+    generator: tuple
+        per chunk, the well names (str ndarray) and the float64 measured
+        depth, inclination and azimuth columns
+    """
+    handle, owned = _open(source)
+    try:
+        headers = [name.strip().strip('"') for name in handle.readline().rstrip("\r\n").split(delimiter)]
+        columns = [headers.index(name)
+                   for name in (well_column, md_column, inc_column, azim_column)]
+        # one parse per chunk: the fields follow the order of usecols
+        dtype = np.dtype([("well", object), ("md", np.float64), ("inc", np.float64),
+                          ("azim", np.float64)])
+        while True:
+            lines = [line for line in islice(handle, chunk_size) if line.strip()]
+            if not lines:
+                break
+            rows = np.loadtxt(lines, delimiter=delimiter, usecols=columns, dtype=dtype, ndmin=1,
+                              quotechar='"')
+            yield (np.char.strip(rows["well"].astype(str)), rows["md"], rows["inc"],
+                   rows["azim"])
+    finally:
+        if owned:
+            handle.close()
+
+
+def iter_jsonl_wells(source, well_key="name", degrees=True):
+    """
+    stream a JSON Lines survey export, one Hydra survey dict (headers, table
+    and start_point, as read by serializeFromHydra) per line
+
+    arguments:
+    source: path or text file object
+        JSON Lines file
+    well_key: str
+        key holding the well name, the line number is used when missing
+    degrees: bool
+        True if the angles are given in degrees
+
+    returns:
+
+    generator: tuple
+        per well, its name, float64 measured depth, inclination and azimuth
+        (radians) and start point
+    """
+    handle, owned = _open(source)
+    try:
+        for number, line in enumerate(handle):
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            table = np.asarray(data["table"], dtype=np.float64).reshape(-1, len(data["headers"]))
+            headers = data["headers"]
+            angles = [table[:, headers.index(name)] for name in (INC_COLUMN, AZIM_COLUMN)]
+            if degrees:
+                angles = [np.deg2rad(angle) for angle in angles]
+            yield (str(data.get(well_key, number)), table[:, headers.index(MD_COLUMN)],
+                   *angles, np.asarray(data.get("start_point", (0, 0, 0)), dtype=np.float64))
+    finally:
+        if owned:
+            handle.close()
+
+
+def assemble_batch(wells, md, inc, azim, start_points=None):
+    """
+    group flat station columns by well into an array-backed batch, with
+    coordinates computed for all wells at once
+
+    arguments:
+    wells: ndarray
+        well name of every station, the wells keep their order of first
+        appearance and their stations are sorted by measured depth
+    md, inc, azim: ndarray
+        measured depth, inclination and azimuth (radians) of every station
+    start_points: dict or array-like, optional
+        start point of every well, by name or as an (n_wells, 3) array in
+        order of first appearance (default: origin)
+
+    returns:
+
+    dict: ndarray
+        wells (names), offsets (n_wells + 1, well w occupies the stations
+        offsets[w]:offsets[w+1]), start_points, measured_depth, inclination,
+        azimuth, x, y and z. Without stations, the batch holds no wells,
+        offsets [0] and empty columns
+    """
+    wells = np.asarray(wells)
+    names, first, inverse = np.unique(wells, return_index=True, return_inverse=True)
+    rank = np.argsort(np.argsort(first, kind="stable"), kind="stable")[inverse.ravel()]
+    order = np.lexsort((md, rank))
+    names = names[np.argsort(first, kind="stable")]
+    counts = np.bincount(rank, minlength=len(names))
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+    if start_points is None:
+        start_points = np.zeros((len(names), 3))
+    elif isinstance(start_points, dict):
+        start_points = np.array([start_points.get(name, (0, 0, 0)) for name in names], dtype=float)
+    start_points = np.broadcast_to(np.asarray(start_points, dtype=float), (len(names), 3))
+
+    md, inc, azim = md[order], inc[order], azim[order]
+    if not len(names):
+        # no stations: an empty batch, offsets [0] and empty columns
+        coords = np.zeros((0, 3))
+    else:
+        coords = calcCoordinatesFromSimplifiedBatch(md, inc, azim, offsets, start_points)
+    return {"wells": names,
+            "offsets": offsets,
+            "start_points": start_points,
+            "measured_depth": md,
+            "inclination": inc,
+            "azimuth": azim,
+            "x": coords[:, 0],
+            "y": coords[:, 1],
+            "z": coords[:, 2]}
+
+
+def load_survey_csv(source, start_points=None, degrees=True, **options):
+    """
+    load a long-format survey CSV with many wells into an array-backed batch,
+    parsing it in chunks straight into typed columns
+
+    arguments:
+    source: path or text file object
+        CSV file, see iter_csv_chunks for the column options
+    start_points: dict or array-like, optional
+        start point of every well, see assemble_batch
+    degrees: bool
+        True if the angles are given in degrees
+    options:
+        column names, delimiter and chunk_size passed to iter_csv_chunks
+
+    returns:
+
+    dict: ndarray
+        batch as returned by assemble_batch
+    """
+    # the stations go into buffers grown in place, with the well names as
+    # integer codes, so that the chunks are not all held before concatenating
+    codes = {}
+    n, capacity = 0, 0
+    ids, values = np.empty(0, dtype=np.int64), np.empty((0, 3))
+    for names, *columns in iter_csv_chunks(source, **options):
+        if n + len(names) > capacity:
+            capacity = max(2*capacity, n + len(names))
+            ids.resize(capacity, refcheck=False)
+            values.resize((capacity, 3), refcheck=False)
+        unique, inverse = np.unique(names, return_inverse=True)
+        ids[n:n + len(names)] = np.array([codes.setdefault(name, len(codes))
+                                          for name in unique], dtype=np.int64)[inverse]
+        values[n:n + len(names)] = np.column_stack(columns)
+        n += len(names)
+    if not n:
+        return assemble_batch(np.zeros(0, dtype=str), *np.zeros((3, 0)))
+    wells = np.array(list(codes))[ids[:n]]
+    md, inc, azim = values[:n].T
+    if degrees:
+        inc, azim = np.deg2rad(inc), np.deg2rad(azim)
+    return assemble_batch(wells, md, inc, azim, start_points)
+
+
+def load_survey_jsonl(source, well_key="name", degrees=True):
+    """
+    load a JSON Lines survey export with one Hydra survey per line into an
+    array-backed batch, with the start point of every line
+
+    arguments:
+    source: path or text file object
+        JSON Lines file
+    well_key: str
+        key holding the well name
+    degrees: bool
+        True if the angles are given in degrees
+
+    returns:
+
+    dict: ndarray
+        batch as returned by assemble_batch
+    """
+    names, columns, start_points = [], [], []
+    for name, md, inc, azim, start_point in iter_jsonl_wells(source, well_key, degrees):
+        names.append(np.full(len(md), name))
+        columns.append((md, inc, azim))
+        start_points.append(start_point)
+    if not names:
+        return assemble_batch(np.zeros(0, dtype=str), *np.zeros((3, 0)))
+    md, inc, azim = (np.concatenate(column) for column in zip(*columns))
+    return assemble_batch(np.concatenate(names), md, inc, azim,
+                          dict(zip((values[0] for values in names), start_points)))
+
+
+def well_trajectory(batch, well):
+    """
+    full trajectory dict of one well of a batch, laid out as the output of
+    serializeFromHydra but with array views instead of lists
+
+    arguments:
+    batch: dict
+        batch as returned by assemble_batch
+    well: int or str
+        index or name of the well
+
+    returns:
+
+    dict: ndarray
+        measured_depth, inclination, azimuth, x, y and z
+    """
+    if not isinstance(well, (int, np.integer)):
+        well = int(np.flatnonzero(batch["wells"] == well)[0])
+    stations = slice(batch["offsets"][well], batch["offsets"][well + 1])
+    return {key: batch[key][stations]
+            for key in ("measured_depth", "inclination", "azimuth", "x", "y", "z")}
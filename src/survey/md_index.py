@@ -0,0 +1,327 @@
+import numpy as np
+
+from .kernels import dogleg_from_terms, sinc, station_terms
+from .wellpath import calcCoordinatesFromSimplifiedData, localCsysFromAngles
+
+# number of bisection steps used to locate TVD crossings, enough to reach
+# machine precision on the fraction of a segment
+BISECTION_STEPS = 60
+
+
+def unit_tangent(terms):
+    """(..., 3) unit tangent in northing, easting, vertical from station terms"""
+    return np.stack((terms["sin_inc"]*terms["cos_azim"],
+                     terms["sin_inc"]*terms["sin_azim"],
+                     terms["cos_inc"]), axis=-1)
+
+
+def md_grid(start, stop, step, include=None):
+    """
+    measured depths every step from start, ending exactly at stop
+
+    arguments:
+    start, stop: float
+        first and last measured depth
+    step: float
+        spacing of the depths (e.g. 1 m, or 3.048 for every 10 ft)
+    include: array-like, optional
+        extra depths merged into the grid (e.g. the survey stations), those
+        outside start and stop are dropped
+
+    returns:
+
+    ndarray: float
+        sorted unique measured depths
+    """
+    if step <= 0:
+        raise ValueError("the measured depth step must be positive")
+    md = float(start) + step*np.arange(int(np.ceil((stop - start)/step)) + 1)
+    # a grid point within rounding of stop is replaced by stop itself
+    md = np.concatenate((md[md < stop - 1e-9*step], [stop]))
+    if include is not None:
+        include = np.asarray(include, dtype=float).ravel()
+        md = np.union1d(md, include[(include >= start) & (include <= stop)])
+    return md
+
+
+class TrajectoryIndex:
+    """
+    measured depth index over a surveyed well path
+
+    Query depths are located with a binary search over the stations and
+    interpolated along the minimum curvature arc of their segment, so the
+    results are exact for the minimum curvature path and hold for
+    horizontal and non-monotonic TVD sections.
+
+    arguments:
+    measured_depth, inclination, azimuth: array-like
+        survey stations, angles in radians, measured depth strictly increasing
+    start_point: array-like
+        coordinates of the first station, used when coordinates is omitted
+    coordinates: array-like, optional
+        (n, 3) coordinates of the stations as computed by
+        calcCoordinatesFromSimplifiedData
+    """
+
+    def __init__(self, measured_depth, inclination, azimuth, start_point=(0, 0, 0), coordinates=None):
+        self.measured_depth = np.asarray(measured_depth, dtype=float)
+        self.inclination = np.asarray(inclination, dtype=float)
+        self.azimuth = np.asarray(azimuth, dtype=float)
+        if len(self.measured_depth) < 2:
+            raise ValueError("at least two stations are needed to index a trajectory")
+        if np.any(np.diff(self.measured_depth) <= 0):
+            raise ValueError("measured depth must increase along the survey")
+        if coordinates is None:
+            coordinates = calcCoordinatesFromSimplifiedData(
+                self.measured_depth, self.inclination, self.azimuth, start_point)
+        self.coordinates = np.asarray(coordinates, dtype=float)
+
+        terms = station_terms(self.measured_depth, self.inclination, self.azimuth)
+        self.tangents = unit_tangent(terms)
+        start = {key: value[:-1] for key, value in terms.items()}
+        end = {key: value[1:] for key, value in terms.items()}
+        self.length = np.diff(self.measured_depth)
+        self.dogleg = dogleg_from_terms(start, end)
+        # beta times the unit normal of the arc plane, finite on straight segments
+        t1, t2 = self.tangents[:-1], self.tangents[1:]
+        self.normal = (t2 - np.cos(self.dogleg)[:, None]*t1)/sinc(self.dogleg)[:, None]
+
+    @classmethod
+    def from_full_trajectory(cls, full_trajectory):
+        """build the index from a full trajectory dict as returned by serializeFromHydra"""
+        coordinates = np.column_stack((full_trajectory["x"],
+                                       full_trajectory["y"],
+                                       full_trajectory["z"]))
+        return cls(full_trajectory["measured_depth"],
+                   full_trajectory["inclination"],
+                   full_trajectory["azimuth"],
+                   coordinates=coordinates)
+
+    def __len__(self):
+        return len(self.measured_depth)
+
+    def locate(self, md):
+        """
+        find the segment holding each measured depth with a binary search
+
+        arguments:
+        md: array-like
+            query measured depths
+
+        returns:
+
+        tuple: ndarray
+            segment index and fraction of the segment length for each query
+        """
+        md = np.asarray(md, dtype=float)
+        segment = np.searchsorted(self.measured_depth, md, side="right") - 1
+        segment = np.clip(segment, 0, len(self.length) - 1)
+        fraction = (md - self.measured_depth[segment])/self.length[segment]
+        return segment, fraction
+
+    def _arc(self, segment, fraction):
+        """position offset and unit tangent at a fraction of each segment arc"""
+        beta = self.dogleg[segment]*fraction
+        t1 = self.tangents[segment]
+        w = self.normal[segment]
+        f = fraction[..., None]
+        along = f*sinc(beta)[..., None]
+        offset = self.length[segment][..., None]*(
+            along*t1 + 0.5*f**2*sinc(0.5*beta)[..., None]**2*w)
+        tangent = np.cos(beta)[..., None]*t1 + along*w
+        return offset, tangent
+
+    def _points(self, segment, fraction):
+        offset, tangent = self._arc(segment, fraction)
+        position = self.coordinates[segment] + offset
+        horizontal = np.hypot(tangent[..., 0], tangent[..., 1])
+        azim1 = self.azimuth[segment]
+        # keep the azimuth on the same branch as the surveyed stations, and
+        # interpolate it linearly where the hole is vertical
+        wrapped = np.arctan2(tangent[..., 1], tangent[..., 0]) - azim1
+        wrapped = (wrapped + np.pi) % (2*np.pi) - np.pi
+        linear = fraction*(self.azimuth[segment + 1] - azim1)
+        azimuth = azim1 + np.where(horizontal > 1e-12, wrapped, linear)
+        return {"measured_depth": self.measured_depth[segment] + fraction*self.length[segment],
+                "inclination": np.arctan2(horizontal, tangent[..., 2]),
+                "azimuth": azimuth,
+                "x": position[..., 0],
+                "y": position[..., 1],
+                "z": position[..., 2]}
+
+    def at_md(self, md):
+        """
+        interpolate the trajectory at an array of measured depths
+
+        arguments:
+        md: array-like
+            query measured depths
+
+        returns:
+
+        dict: ndarray
+            measured_depth, inclination, azimuth, x, y and z for every query,
+            NaN where the depth lies outside the surveyed interval
+        """
+        md = np.asarray(md, dtype=float)
+        segment, fraction = self.locate(md)
+        point = self._points(segment, fraction)
+        outside = (md < self.measured_depth[0]) | (md > self.measured_depth[-1])
+        if np.any(outside):
+            for value in point.values():
+                value[outside] = np.nan
+        return point
+
+    def resample(self, step, start=None, stop=None, include_stations=False):
+        """
+        interpolate the trajectory at a uniform measured depth step along
+        the minimum curvature arcs
+
+        arguments:
+        step: float
+            measured depth spacing
+        start, stop: float, optional
+            first and last depth (default: the first and last station)
+        include_stations: bool
+            if True, the survey stations are kept among the points
+
+        returns:
+
+        dict: ndarray
+            measured_depth, inclination, azimuth, x, y and z, as in at_md
+        """
+        start = self.measured_depth[0] if start is None else start
+        stop = self.measured_depth[-1] if stop is None else stop
+        return self.at_md(md_grid(start, stop, step,
+                                  self.measured_depth if include_stations else None))
+
+    def local_csys(self, md, vectors_only=False):
+        """
+        calculate the local coordinate systems at an array of measured depths,
+        following the arc interpolated attitude
+
+        arguments:
+        md: array-like
+            query measured depths
+        vectors_only: bool
+            if True, return the tangent, normal and binormal vectors instead
+            of the stacked frames
+
+        returns:
+
+        tuple:
+            (N, 3, 3) frames as in wellpath.localCsysFromAngles (or the
+            tangent, normal and binormal (N, 3) vectors) and the
+            interpolated points
+        """
+        point = self.at_md(md)
+        csys = localCsysFromAngles(point["inclination"], point["azimuth"], vectors_only)
+        return csys, point
+
+    def _monotonic_pieces(self):
+        """split every segment at its TVD extremum into monotonic pieces"""
+        t1z = self.tangents[:-1, 2]
+        wz = self.normal[:, 2]
+        # the vertical tangent component cos(theta)*t1z + sin(theta)*nz
+        # vanishes at theta = atan2(-t1z, nz) modulo pi, with nz = wz/beta
+        theta = np.mod(np.arctan2(-t1z*self.dogleg, wz), np.pi)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            turn = theta/self.dogleg
+        interior = (self.dogleg > 0) & (turn > 0) & (turn < 1)
+        n = len(self.length)
+        segment = np.concatenate((np.arange(n), np.flatnonzero(interior)))
+        lower = np.concatenate((np.zeros(n), turn[interior]))
+        upper = np.concatenate((np.where(interior, turn, 1), np.ones(interior.sum())))
+        return segment, lower, upper
+
+    def _tvd_at(self, segment, fraction):
+        return self.coordinates[segment, 2] + self._arc(segment, fraction)[0][..., 2]
+
+    def at_tvd(self, tvd):
+        """
+        find every crossing of an array of vertical depths, so that wells
+        whose TVD is not monotonic (horizontal, undulating or drop-off
+        sections) return all the points at each depth
+
+        arguments:
+        tvd: array-like
+            query vertical depths
+
+        returns:
+
+        tuple:
+            query index (into tvd) of every crossing, and a dict with the
+            measured_depth, inclination, azimuth, x, y and z of every
+            crossing, sorted by query and then by measured depth. A section
+            held at exactly the query depth returns its start point
+        """
+        tvd = np.atleast_1d(np.asarray(tvd, dtype=float))
+        order = np.argsort(tvd, kind="stable")
+        sorted_tvd = tvd[order]
+
+        segment, lower, upper = self._monotonic_pieces()
+        z_lower = self._tvd_at(segment, lower)
+        z_upper = self._tvd_at(segment, upper)
+        z_min = np.minimum(z_lower, z_upper)
+        z_max = np.maximum(z_lower, z_upper)
+        first = np.searchsorted(sorted_tvd, z_min, side="left")
+        last = np.searchsorted(sorted_tvd, z_max, side="right")
+        counts = last - first
+
+        # one (piece, query) pair for every query inside the TVD range of a piece
+        piece = np.repeat(np.arange(len(segment)), counts)
+        query = order[np.repeat(first - np.cumsum(counts) + counts, counts) +
+                      np.arange(counts.sum())]
+        segment = segment[piece]
+        target = tvd[query]
+        low, high = lower[piece], upper[piece]
+        rising = z_upper[piece] >= z_lower[piece]
+        for _ in range(BISECTION_STEPS):
+            middle = 0.5*(low + high)
+            below = (self._tvd_at(segment, middle) < target) == rising
+            low = np.where(below, middle, low)
+            high = np.where(below, high, middle)
+        flat = z_lower[piece] == z_upper[piece]
+        fraction = np.where(flat, lower[piece], 0.5*(low + high))
+
+        point = self._points(segment, fraction)
+        point["z"] = target
+        # a depth reached exactly at a station is found in both adjacent pieces
+        keys = np.lexsort((point["measured_depth"], query))
+        query = query[keys]
+        point = {key: value[keys] for key, value in point.items()}
+        duplicate = np.zeros(len(query), dtype=bool)
+        duplicate[1:] = ((query[1:] == query[:-1]) &
+                         np.isclose(point["measured_depth"][1:],
+                                    point["measured_depth"][:-1], rtol=0, atol=1e-9))
+        keep = ~duplicate
+        return query[keep], {key: value[keep] for key, value in point.items()}
+
+
+def resample_well_path(data, step, initial_pos=[0, 0, 0], include_stations=False):
+    """
+    interpolate a survey at a uniform measured depth step, for export, log
+    correlation or torque and drag. The points lie on the minimum curvature
+    arcs between the stations, as calc_well_path computes them with its
+    default method
+
+    arguments:
+    data: array-like
+        (n, 3) table of measured depth, inclination and azimuth (radians),
+        the input of calc_well_path
+    step: float
+        measured depth spacing
+    initial_pos: array-like
+        northing, easting and vertical position of the first station
+    include_stations: bool
+        if True, the survey stations are kept among the points
+
+    returns:
+
+    dict: ndarray
+        measured_depth, inclination, azimuth, x (northing), y (easting) and
+        z (vertical) of every point
+    """
+    data = np.asarray(data, dtype=float)
+    index = TrajectoryIndex(data[:, 0], data[:, 1], data[:, 2], initial_pos)
+    return index.resample(step, include_stations=include_stations)
@@ -1,5 +1,7 @@
 import numpy as np
 
+from .kernels import mean_terms, station_terms, stack_segment
+
 def calc_segment(md1, inc1, azim1, md2, inc2, azim2):
     """
     calculate the positional increments of northing, easting, vertical and reach
@@ -33,3 +35,19 @@ def calc_segment(md1, inc1, azim1, md2, inc2, azim2):
     d_vertical = dMD * (np.cos(half_inc))
     d_reach = dMD * (np.sin(half_inc))
     return [d_north, d_east, d_vertical, d_reach]
+
+
+def calc_segments(md1, inc1, azim1, md2, inc2, azim2):
+    """vectorized calc_segment over arrays of station pairs, see kernels.segment_terms"""
+    return calc_segments_from_terms(station_terms(md1, inc1, azim1),
+                                    station_terms(md2, inc2, azim2))
+
+
+def calc_segments_from_terms(start, end, segment=None):
+    """mean angle segments: the course length along the mean inclination and azimuth"""
+    mean = mean_terms(start, end) if segment is None else segment
+    dMD = end["md"] - start["md"]
+    return stack_segment(dMD * mean["sin_inc"] * mean["cos_azim"],
+                         dMD * mean["sin_inc"] * mean["sin_azim"],
+                         dMD * mean["cos_inc"],
+                         dMD * mean["sin_inc"])
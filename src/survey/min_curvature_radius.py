@@ -1,5 +1,8 @@
 import numpy as np
 
+from .kernels import (dogleg_from_terms, ratio_factor, station_terms,
+                      stack_segment)
+
 
 def calc_segment_mitchell(md1, inc1, azim1, md2, inc2, azim2):
     """"
@@ -66,23 +69,30 @@ def calc_segment(md1, inc1, azim1, md2, inc2, azim2):
     list: float
         A list with the lengths dx, dy and dz of the segment
     """
-    dM = md2-md1
-    dinc = inc2-inc1
-    dazim = azim2-azim1
-    beta = np.arccos(np.cos(dinc)-np.sin(inc1)*np.sin(inc2)*(1 - np.cos(dazim)))
-    F = (2/beta)*np.tan(0.5*beta) if beta !=0 else 1
-    dN = (dM/2)*(np.sin(inc2)*np.cos(azim2)+ np.sin(inc1)*np.cos(azim1))*F
-    dE = (dM/2)*(np.sin(inc2)*np.sin(azim2)+ np.sin(inc1)*np.sin(azim1))*F
-    dTVD = (dM/2)*(np.cos(inc2)+ np.cos(inc1))*F
-    d_reach = (dM/2)*(np.sin(inc1) + np.sin(inc2))*F
-
-    dx = dN
-    dy = dE
-    dz = dTVD
-    d_reach = d_reach
+    # components on the last axis, so that array inputs unpack per component
+    dx, dy, dz, d_reach = np.moveaxis(calc_segments(md1, inc1, azim1, md2, inc2, azim2), -1, 0)
     return [dx, dy, dz, d_reach]
 
 
+def calc_segments(md1, inc1, azim1, md2, inc2, azim2):
+    """vectorized calc_segment over arrays of station pairs, see kernels.segment_terms"""
+    return calc_segments_from_terms(station_terms(md1, inc1, azim1),
+                                    station_terms(md2, inc2, azim2))
+
+
+def calc_segments_from_terms(start, end, segment=None):
+    """minimum curvature segments: the summed station tangents times dMD / 2 and the ratio factor"""
+    beta = dogleg_from_terms(start, end) if segment is None else segment["dogleg"]
+    # straight holds (beta = 0) are handled by the series form of the ratio factor
+    F = ratio_factor(beta)
+    half_dM = 0.5*(end["md"] - start["md"])*F
+    return stack_segment(
+        half_dM*(end["sin_inc"]*end["cos_azim"] + start["sin_inc"]*start["cos_azim"]),
+        half_dM*(end["sin_inc"]*end["sin_azim"] + start["sin_inc"]*start["sin_azim"]),
+        half_dM*(end["cos_inc"] + start["cos_inc"]),
+        half_dM*(start["sin_inc"] + end["sin_inc"]))
+
+
 
 
 # def min_curvature_survey(md, inc, azim):
\ No newline at end of file
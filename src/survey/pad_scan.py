@@ -0,0 +1,211 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .anticollision import SegmentGrid
+from .batch import _check_offsets
+from .uncertainty import station_covariances_batch
+from .wellpath import calcCoordinatesFromSimplifiedBatch, localCsysFromAngles
+
+# arrays shared with the workers, in the order they are published
+SHARED_ARRAYS = ("md", "inc", "azim", "offsets", "coordinates", "covariance")
+
+# state of a worker process: the attached shared memory blocks, the arrays
+# viewing them and the segment grid built over them
+_WORKER = {}
+
+
+def _share(arrays):
+    """copy arrays into new shared memory blocks, returning the blocks and their specs"""
+    blocks, specs = [], {}
+    for name in SHARED_ARRAYS:
+        value = np.ascontiguousarray(arrays[name])
+        block = shared_memory.SharedMemory(create=True, size=max(value.nbytes, 1))
+        np.ndarray(value.shape, value.dtype, buffer=block.buf)[...] = value
+        blocks.append(block)
+        specs[name] = (block.name, value.shape, value.dtype.str)
+    return blocks, specs
+
+
+def _attach(specs):
+    blocks, arrays = [], {}
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype, buffer=block.buf)
+    return blocks, arrays
+
+
+def _init_worker(specs, cell_size, radius):
+    blocks, arrays = _attach(specs)
+    _WORKER.update(arrays)
+    _WORKER["blocks"] = blocks
+    _WORKER["grid"] = SegmentGrid(arrays["md"], arrays["coordinates"], arrays["offsets"],
+                                  cell_size, radius)
+
+
+def _interpolate(md, values, query):
+    """linear interpolation of per-station values at measured depths of one well"""
+    segment = np.clip(np.searchsorted(md, query, side="right") - 1, 0, max(len(md) - 2, 0))
+    following = np.minimum(segment + 1, len(md) - 1)
+    span = md[following] - md[segment]
+    fraction = np.divide(query - md[segment], span, out=np.zeros_like(query), where=span > 0)
+    fraction = fraction.reshape(fraction.shape + (1,)*(values.ndim - 1))
+    return values[segment]*(1 - fraction) + values[following]*fraction
+
+
+def _scan_task(reference, first, last, radius, sigma_scale, hole_radius):
+    """separation report of the stations first:last of a reference well against every offset well"""
+    grid = _WORKER["grid"]
+    offsets = _WORKER["offsets"]
+    stations = slice(offsets[reference] + first, offsets[reference] + last)
+    md = _WORKER["md"][stations]
+    report = grid.closest_approach(md, _WORKER["coordinates"][stations], radius, reference)
+
+    covariance = _WORKER["covariance"]
+    ref_cov = _interpolate(md, covariance[stations], report["reference_md"])
+    off_cov = np.empty_like(ref_cov)
+    for well in np.unique(report["offset_well"]):
+        rows = report["offset_well"] == well
+        well_stations = slice(offsets[well], offsets[well + 1])
+        off_cov[rows] = _interpolate(grid.md[well_stations], covariance[well_stations],
+                                     report["offset_md"][rows])
+
+    # uncertainties along the center to center line
+    gap = report["offset_point"] - report["reference_point"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        direction = gap/report["distance"][:, None]
+        sigma_reference = np.sqrt(np.einsum("ni,nij,nj->n", direction, ref_cov, direction))
+        sigma_offset = np.sqrt(np.einsum("ni,nij,nj->n", direction, off_cov, direction))
+        separation_factor = ((report["distance"] - 2*hole_radius) /
+                             (sigma_scale*np.hypot(sigma_reference, sigma_offset)))
+
+    # traveling cylinder: direction of the offset well around the reference
+    # hole, measured from its high side
+    inc = _interpolate(md, _WORKER["inc"][stations], report["reference_md"])
+    azim = _interpolate(md, _WORKER["azim"][stations], report["reference_md"])
+    _, normal, binormal = localCsysFromAngles(inc, azim, vectors_only=True)
+    tool_face = np.arctan2(np.sum(gap*binormal, axis=-1), np.sum(gap*normal, axis=-1)) % (2*np.pi)
+
+    report["reference_well"] = np.full(len(report["distance"]), reference)
+    report["sigma_reference"] = sigma_reference
+    report["sigma_offset"] = sigma_offset
+    report["separation_factor"] = separation_factor
+    report["tool_face"] = tool_face
+    return report
+
+
+def _partition_stations(offsets, n_tasks):
+    """
+    split the reference segments of every well into about n_tasks runs of
+    consecutive segments, each scanned against all offset wells, so that the
+    total work does not grow with the number of tasks
+    """
+    n_wells = len(offsets) - 1
+    groups = max(1, -(-n_tasks // max(n_wells, 1)))
+    tasks = []
+    for reference in range(n_wells):
+        n_segments = offsets[reference + 1] - offsets[reference] - 1
+        if n_segments < 1:
+            continue
+        bounds = np.linspace(0, n_segments, min(groups, n_segments) + 1).astype(int)
+        # consecutive runs share their boundary station
+        tasks.extend((reference, int(first), int(last) + 1)
+                     for first, last in zip(bounds[:-1], bounds[1:]))
+    return tasks
+
+
+def _merge(reports):
+    if not reports:
+        return {}
+    merged = {key: np.concatenate([report[key] for report in reports]) for key in reports[0]}
+    order = np.lexsort((merged["offset_well"], merged["reference_md"], merged["reference_well"]))
+    return {key: value[order] for key, value in merged.items()}
+
+
+def scan_pad_separation(md, inc, azim, offsets, start_points, radius, sigma_random=0.,
+                        sigma_systematic=0., sigma_scale=2., hole_radius=0., cell_size=None,
+                        max_workers=None, tasks_per_worker=4):
+    """
+    separation factor and traveling cylinder report of every well of a pad
+    against every offset well
+
+    The trajectories and position covariances are computed once, published
+    in shared memory and attached by every worker of a process pool, so only
+    the tasks, runs of reference segments scanned against all offset wells,
+    and their reports are pickled. Every
+    worker builds its own segment grid over the shared arrays.
+
+    arguments:
+    md, inc, azim: ndarray
+        flat measured depth, inclination and azimuth (radians) of all wells
+    offsets: ndarray
+        (n_wells + 1) offsets, well w occupies the stations
+        offsets[w]:offsets[w+1]
+    start_points: array-like
+        (n_wells, 3) northing, easting and vertical of the first stations
+    radius: float
+        largest center to center distance reported
+    sigma_random, sigma_systematic: array-like
+        standard deviations of the measured depth, inclination and azimuth
+        errors, as in uncertainty.station_covariances_batch
+    sigma_scale: float
+        number of standard deviations in the separation factor
+    hole_radius: float
+        radius of both holes, subtracted twice from the distance
+    cell_size: float, optional
+        grid cell size, as in anticollision.SegmentGrid (default: built for
+        the radius)
+    max_workers: int, optional
+        number of processes, defaults to the number of CPUs; 1 scans in the
+        calling process
+    tasks_per_worker: int
+        number of tasks per process, to balance uneven wells
+
+    returns:
+
+    dict: ndarray
+        one row per reference segment and offset well within the radius,
+        sorted by reference well, reference MD and offset well:
+        reference_well, reference_md, offset_well, offset_md, distance,
+        reference_point, offset_point, sigma_reference, sigma_offset,
+        separation_factor = (distance - 2 hole_radius) /
+        (sigma_scale sqrt(sigma_reference^2 + sigma_offset^2)) and tool_face,
+        the high side angle (radians) of the offset well around the
+        reference hole
+    """
+    md = np.asarray(md, dtype=float)
+    inc = np.asarray(inc, dtype=float)
+    azim = np.asarray(azim, dtype=float)
+    offsets = _check_offsets(offsets, len(md))
+    arrays = {"md": md, "inc": inc, "azim": azim, "offsets": offsets,
+              "coordinates": calcCoordinatesFromSimplifiedBatch(md, inc, azim, offsets, start_points),
+              "covariance": station_covariances_batch(md, inc, azim, offsets,
+                                                      sigma_random, sigma_systematic)}
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    tasks = _partition_stations(offsets, max_workers*tasks_per_worker)
+    options = (radius, sigma_scale, hole_radius)
+
+    blocks, specs = _share(arrays)
+    try:
+        if max_workers == 1:
+            _init_worker(specs, cell_size, radius)
+            try:
+                reports = [_scan_task(*task, *options) for task in tasks]
+            finally:
+                for block in _WORKER.pop("blocks"):
+                    block.close()
+                _WORKER.clear()
+        else:
+            with ProcessPoolExecutor(max_workers, initializer=_init_worker,
+                                     initargs=(specs, cell_size, radius)) as pool:
+                futures = [pool.submit(_scan_task, *task, *options) for task in tasks]
+                reports = [future.result() for future in futures]
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return _merge(reports)
@@ -0,0 +1,122 @@
+import numpy as np
+from matplotlib import pyplot as plt
+
+from .decimation import screen_mask
+
+
+def get_plot_projection_figs():
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    # ax1: Vertical Section (Reach vs TVD)
+    ax1.set_xlabel('Reach (m)')
+    ax1.set_ylabel('TVD (m)')
+    ax1.set_title('Vertical Section')
+    ax1.invert_yaxis()  # TVD increases downwards
+
+    # ax2: Plan View (Easting vs Northing)
+    ax2.set_xlabel('Easting (m)')
+    ax2.set_ylabel('Northing (m)')
+    ax2.set_title('Plan View')
+
+    return ax1, ax2
+
+def get_plot3D_fig():
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+    ax.set_xlabel('Easting (m)')
+    ax.set_ylabel('Northing (m)')
+    ax.set_zlabel('TVD (m)')
+    ax.invert_zaxis()  # Invert Z axis to have TVD increasing downwards
+    return ax
+
+
+def _field_view(coordinates, offsets, view):
+    """screen-space axes of the field views: plan, section or 3d"""
+    north, east, tvd = coordinates.T
+    if view == "plan":
+        return np.column_stack((east, north))
+    if view == "section":
+        start = np.repeat(coordinates[offsets[:-1], :2], np.diff(offsets), axis=0)
+        return np.column_stack((np.hypot(north - start[:, 0], east - start[:, 1]), tvd))
+    if view == "3d":
+        return np.column_stack((east, north, tvd))
+    raise ValueError(f"View '{view}' is not recognized.")
+
+
+def plot_field(ax, coordinates, offsets, view="plan", milestones=None, milestone_wells=None,
+               pixel_tolerance=0.5, milestone_kwargs=None, **line_kwargs):
+    """
+    draw many wells as one line collection, decimated to screen resolution
+
+    Every path is reduced in screen space (decimation.screen_mask) so that
+    no dropped station lies farther than pixel_tolerance pixels from the
+    drawn line,
+    and all the wells go into a single LineCollection (Line3DCollection on
+    3D axes). Milestones are drawn as one scatter.
+
+    arguments:
+    ax: matplotlib axes, from get_plot_projection_figs, get_plot3D_fig or
+        plt.subplots
+    coordinates: (N, 3) northing, easting and TVD of all stations
+    offsets: (n_wells + 1) offsets, well w occupies the stations
+        offsets[w]:offsets[w+1]
+    view: "plan" (easting vs northing), "section" (horizontal displacement
+        from the first station vs TVD) or "3d" (easting, northing, TVD)
+    milestones: (M, 3) northing, easting and TVD of the milestones, drawn in
+        the same view
+    milestone_wells: (M,) well of every milestone, whose first station is
+        the origin of the displacement in the section view; required there,
+        since wellheads on a pad are too close to tell the wells apart
+    pixel_tolerance: largest deviation of the drawn line, in pixels
+    milestone_kwargs: dict of scatter options
+    line_kwargs: LineCollection options (colors, linewidths, ...)
+
+    returns:
+    collection, scatter (or None) and the (N,) mask of the drawn stations
+    """
+    from matplotlib.collections import LineCollection
+
+    coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 3)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    has_milestones = milestones is not None and len(milestones)
+    if view == "section" and has_milestones and milestone_wells is None:
+        raise ValueError("milestone_wells is required to place milestones in the section view")
+    points = _field_view(coordinates, offsets, view)
+    low, high = points.min(axis=0), points.max(axis=0)
+    if view == "3d":
+        ax.set_xlim(low[0], high[0])
+        ax.set_ylim(low[1], high[1])
+        ax.set_zlim(high[2], low[2])
+        # data units per pixel of the smallest axis extent
+        box = ax.get_window_extent()
+        scale = (high - low).max() / max(min(box.width, box.height), 1)
+        screen = points / max(scale, 1e-12)
+    else:
+        ax.update_datalim(np.vstack((low, high)))
+        ax.autoscale_view()
+        if view == "section" and not ax.yaxis_inverted():
+            ax.invert_yaxis()  # TVD increases downwards
+        screen = ax.transData.transform(points)
+    keep = screen_mask(screen, offsets, pixel_tolerance)
+    counts = np.add.reduceat(keep, offsets[:-1])
+    lines = np.split(points[keep], np.cumsum(counts)[:-1])
+    if view == "3d":
+        from mpl_toolkits.mplot3d.art3d import Line3DCollection
+        collection = Line3DCollection(lines, **line_kwargs)
+        ax.add_collection3d(collection)
+    else:
+        collection = LineCollection(lines, **line_kwargs)
+        ax.add_collection(collection)
+
+    scatter = None
+    if has_milestones:
+        milestones = np.asarray(milestones, dtype=float).reshape(-1, 3)
+        if view == "section":
+            heads = coordinates[offsets[:-1], :2]
+            milestone_wells = np.asarray(milestone_wells, dtype=np.int64)
+            marks = np.column_stack((np.linalg.norm(milestones[:, :2] - heads[milestone_wells], axis=1),
+                                     milestones[:, 2]))
+        else:
+            marks = _field_view(milestones, np.array([0, len(milestones)]), view)
+        options = {"color": "k", "s": 8, "zorder": 3, **(milestone_kwargs or {})}
+        scatter = ax.scatter(*marks.T, **options)
+    return collection, scatter, keep
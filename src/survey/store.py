@@ -0,0 +1,205 @@
+import json
+
+import numpy as np
+
+from .batch import _check_offsets, calc_well_paths
+
+MAGIC = b"DWTRAJ01"
+# station columns of the store, in file order
+COLUMNS = ("measured_depth", "inclination", "azimuth", "north", "east", "tvd", "reach", "dls")
+# byte alignment of every array in the file
+ALIGNMENT = 64
+
+
+def _aligned(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def station_columns(md, inc, azim, offsets, initial_pos=None, method="min_curvature_radius"):
+    """
+    compute the per-station columns of many wells packed into flat arrays
+
+    arguments:
+    md, inc, azim: ndarray
+        flat measured depth, inclination and azimuth (radians) of all wells
+    offsets: ndarray
+        (n_wells + 1) offsets, well w occupies the stations
+        offsets[w]:offsets[w+1]
+    initial_pos: array-like, optional
+        (n_wells, 3) position of the first station of each well
+    method: str
+        survey method name, as in calc_well_path
+
+    returns:
+
+    dict: ndarray
+        one (N,) array per name of COLUMNS. The first station of every well
+        holds its initial position, the initial reach and a zero dogleg
+        severity, the others the calc_well_path row of the segment ending
+        there
+    """
+    md = np.asarray(md, dtype=float)
+    offsets = _check_offsets(offsets, len(md))
+    n_wells = len(offsets) - 1
+    if initial_pos is None:
+        initial_pos = np.zeros((n_wells, 3))
+    initial_pos = np.broadcast_to(np.asarray(initial_pos, dtype=float), (n_wells, 3))
+    _, path, _ = calc_well_paths(md, inc, azim, offsets, initial_pos, method)
+
+    stations = np.empty((len(md), 5))
+    first = np.zeros(len(md), dtype=bool)
+    first[offsets[:-1]] = True
+    stations[first, :3] = initial_pos
+    stations[first, 3] = np.hypot(initial_pos[:, 0], initial_pos[:, 1])
+    stations[first, 4] = 0
+    stations[~first] = path
+    return dict(zip(COLUMNS, (md, np.asarray(inc, dtype=float), np.asarray(azim, dtype=float),
+                              *stations.T)))
+
+
+def write_store(filename, columns, offsets, wells=None, method="min_curvature_radius"):
+    """
+    write station columns to a columnar binary file: a JSON header, the
+    int64 offsets and one contiguous float64 array per column
+
+    arguments:
+    filename: str or path
+        output file
+    columns: dict
+        one (N,) array per name of COLUMNS, as returned by station_columns
+    offsets: ndarray
+        (n_wells + 1) offsets of the wells
+    wells: sequence of str, optional
+        well names (default: their index)
+    method: str
+        survey method recorded in the header
+    """
+    offsets = _check_offsets(offsets, len(columns["measured_depth"]))
+    n_wells = len(offsets) - 1
+    wells = [str(w) for w in (range(n_wells) if wells is None else wells)]
+    if len(wells) != n_wells:
+        raise ValueError("one well name is needed per well")
+    n = int(offsets[-1])
+    header = {"columns": list(COLUMNS), "n_wells": n_wells, "n_stations": n,
+              "wells": wells, "method": method}
+    encoded = json.dumps(header).encode()
+    position = _aligned(len(MAGIC) + 8 + len(encoded))
+    header["offsets_start"] = position
+    position = _aligned(position + 8*(n_wells + 1))
+    header["data_start"] = position
+    header["column_stride"] = _aligned(8*n)
+    encoded = json.dumps(header).encode()
+    # the offsets moved if the longer header crossed an alignment boundary
+    while _aligned(len(MAGIC) + 8 + len(encoded)) > header["offsets_start"]:
+        header["offsets_start"] += ALIGNMENT
+        header["data_start"] = _aligned(header["offsets_start"] + 8*(n_wells + 1))
+        encoded = json.dumps(header).encode()
+
+    with open(filename, "wb") as handle:
+        handle.write(MAGIC)
+        handle.write(np.uint64(len(encoded)).tobytes())
+        handle.write(encoded)
+        handle.seek(header["offsets_start"])
+        handle.write(np.asarray(offsets, dtype="<i8").tobytes())
+        for i, name in enumerate(COLUMNS):
+            handle.seek(header["data_start"] + i*header["column_stride"])
+            handle.write(np.asarray(columns[name], dtype="<f8").tobytes())
+        handle.truncate(header["data_start"] + len(COLUMNS)*header["column_stride"])
+
+
+def write_trajectory_store(filename, md, inc, azim, offsets, initial_pos=None, wells=None,
+                           method="min_curvature_radius"):
+    """
+    compute and write the trajectories of many wells packed into flat
+    arrays, see station_columns and write_store
+    """
+    columns = station_columns(md, inc, azim, offsets, initial_pos, method)
+    write_store(filename, columns, offsets, wells, method)
+
+
+def write_full_trajectories(filename, trajectories, wells=None, method="min_curvature_radius"):
+    """
+    write full trajectory dicts, as returned by serializeFromHydra, to a
+    store. The first x, y and z of each trajectory is its initial position
+    """
+    md, inc, azim = (np.concatenate([np.asarray(t[key], dtype=float) for t in trajectories])
+                     for key in ("measured_depth", "inclination", "azimuth"))
+    counts = [len(t["measured_depth"]) for t in trajectories]
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+    initial_pos = [(t["x"][0], t["y"][0], t["z"][0]) for t in trajectories]
+    write_trajectory_store(filename, md, inc, azim, offsets, initial_pos, wells, method)
+
+
+class TrajectoryStore:
+    """
+    read-only, memory-mapped view of a trajectory store written by
+    write_store. Opening only reads the header; columns and wells are
+    numpy.memmap views, so slicing one well copies nothing
+
+    arguments:
+    filename: str or path
+        store file
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as handle:
+            if handle.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{filename} is not a trajectory store")
+            size = int(np.frombuffer(handle.read(8), dtype=np.uint64)[0])
+            self.header = json.loads(handle.read(size))
+        self.wells = self.header["wells"]
+        self.method = self.header["method"]
+        self._index = {name: i for i, name in enumerate(self.wells)}
+        self.offsets = np.memmap(filename, dtype="<i8", mode="r",
+                                 offset=self.header["offsets_start"],
+                                 shape=(self.header["n_wells"] + 1,))
+        n = self.header["n_stations"]
+        self.columns = {name: np.memmap(filename, dtype="<f8", mode="r", shape=(n,),
+                                        offset=self.header["data_start"] + i*self.header["column_stride"])
+                        for i, name in enumerate(self.header["columns"])} if n else \
+            {name: np.zeros(0) for name in self.header["columns"]}
+
+    def __len__(self):
+        return self.header["n_wells"]
+
+    def _stations(self, well):
+        if not isinstance(well, (int, np.integer)):
+            well = self._index[well]
+        return slice(int(self.offsets[well]), int(self.offsets[well + 1]))
+
+    def well(self, well):
+        """
+        columns of one well as memmap views
+
+        arguments:
+        well: int or str
+            index or name of the well
+
+        returns:
+
+        dict: ndarray
+            one view per name of COLUMNS
+        """
+        stations = self._stations(well)
+        return {name: column[stations] for name, column in self.columns.items()}
+
+    def full_trajectory(self, well):
+        """one well laid out as the output of serializeFromHydra, with views"""
+        data = self.well(well)
+        return {"measured_depth": data["measured_depth"],
+                "inclination": data["inclination"],
+                "azimuth": data["azimuth"],
+                "x": data["north"],
+                "y": data["east"],
+                "z": data["tvd"]}
+
+    def survey(self, well):
+        """(n, 3) survey table of one well, the input of calc_well_path"""
+        data = self.well(well)
+        return np.column_stack((data["measured_depth"], data["inclination"], data["azimuth"]))
+
+    def well_path(self, well):
+        """(n - 1, 5) path of one well, as the path returned by calc_well_path"""
+        data = self.well(well)
+        return np.column_stack([data[name][1:] for name in ("north", "east", "tvd", "reach", "dls")])
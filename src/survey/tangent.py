@@ -1,5 +1,7 @@
 import numpy as np
 
+from .kernels import station_terms, stack_segment
+
 def calc_segment(md1, inc1, azim1, md2, inc2, azim2):
     """"
     calculate the positional increments dN, dE and dV based on a
@@ -23,4 +25,18 @@ def calc_segment(md1, inc1, azim1, md2, inc2, azim2):
     d_east = dMD * np.sin(inc2) * np.sin(azim2)
     d_vertical = dMD * np.cos(inc2)
     d_reach = dMD * np.sin(inc2)
-    return [d_north, d_east, d_vertical, d_reach]
\ No newline at end of file
+    return [d_north, d_east, d_vertical, d_reach]
+
+def calc_segments(md1, inc1, azim1, md2, inc2, azim2):
+    """vectorized calc_segment over arrays of station pairs, see kernels.segment_terms"""
+    return calc_segments_from_terms(station_terms(md1, inc1, azim1),
+                                    station_terms(md2, inc2, azim2))
+
+
+def calc_segments_from_terms(start, end, segment=None):
+    """tangent segments: the whole course length along the attitude of the second station"""
+    dMD = end["md"] - start["md"]
+    return stack_segment(dMD * end["sin_inc"] * end["cos_azim"],
+                         dMD * end["sin_inc"] * end["sin_azim"],
+                         dMD * end["cos_inc"],
+                         dMD * end["sin_inc"])
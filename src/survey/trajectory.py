@@ -0,0 +1,127 @@
+import numpy as np
+
+from . import DogLegSeverity, get_segment_method
+
+
+class SurveyTrajectory:
+    """
+    append-only well path for real-time survey feeds
+
+    Every appended station computes only its own segment and extends the
+    running northing, easting, vertical, reach and dogleg severity. Results
+    are kept in preallocated buffers that double in size when full, and are
+    exposed as read-only views that share memory with the buffers.
+
+    arguments:
+    initial_pos: array-like
+        northing, easting and vertical position of the first station
+    method: str
+        survey method name, as in calc_well_path
+    capacity: int
+        number of stations to preallocate
+    """
+
+    def __init__(self, initial_pos=[0, 0, 0], method="min_curvature_radius", capacity=64):
+        self.initial_pos = np.asarray(initial_pos, dtype=float)
+        self.method = method
+        self.calc_func = get_segment_method(method)
+        self.n_stations = 0
+        capacity = max(int(capacity), 2)
+        self._stations = np.empty((capacity, 3))
+        self._segments = np.empty((capacity - 1, 5))
+        # row 0 holds the initial position, row i the position at station i
+        self._path = np.empty((capacity, 5))
+        reach0 = np.sqrt(self.initial_pos[0]**2 + self.initial_pos[1]**2)
+        self._path[0] = (*self.initial_pos, reach0, 0)
+
+    def __len__(self):
+        return self.n_stations
+
+    def _reserve(self, n_stations):
+        capacity = len(self._stations)
+        if n_stations <= capacity:
+            return
+        while capacity < n_stations:
+            capacity *= 2
+        for name, width in (("_stations", 3), ("_segments", 5), ("_path", 5)):
+            old = getattr(self, name)
+            rows = capacity - 1 if name == "_segments" else capacity
+            new = np.empty((rows, width))
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def append(self, md, inc, azim):
+        """
+        append one survey station and compute its segment
+
+        arguments:
+        md: float
+            measured depth of the new station
+        inc: float
+            inclination with respect to vertical (radians)
+        azim: float
+            azimuth with respect to north (radians)
+        """
+        self.extend([[md, inc, azim]])
+
+    def extend(self, data):
+        """
+        append several survey stations at once
+
+        arguments:
+        data: array-like
+            (n, 3) table of measured depth, inclination and azimuth (radians)
+        """
+        data = np.asarray(data, dtype=float).reshape(-1, 3)
+        if len(data) == 0:
+            return
+        n = self.n_stations
+        previous_md = self._stations[n-1, 0] if n else -np.inf
+        if np.any(np.diff(np.concatenate(([previous_md], data[:, 0]))) <= 0):
+            raise ValueError("measured depth must increase along the survey")
+        self._reserve(n + len(data))
+        self._stations[n:n + len(data)] = data
+        self.n_stations = n + len(data)
+        if self.n_stations < 2:
+            return
+
+        first = max(n, 1)
+        start = self._stations[first-1:self.n_stations-1].T
+        end = self._stations[first:self.n_stations].T
+        segments = self._segments[first-1:self.n_stations-1]
+        segments[:, :4] = self.calc_func(*start, *end)
+        segments[:, 4] = DogLegSeverity(*start, *end)
+        path = self._path[first:self.n_stations]
+        path[:, :4] = self._path[first-1, :4] + np.cumsum(segments[:, :4], axis=0)
+        path[:, 4] = segments[:, 4]
+
+    @staticmethod
+    def _view(values):
+        view = values.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def stations(self):
+        """(n, 3) view of the measured depth, inclination and azimuth"""
+        return self._view(self._stations[:self.n_stations])
+
+    @property
+    def segments(self):
+        """(n - 1, 5) view of the segments, laid out as in calc_well_path"""
+        return self._view(self._segments[:max(self.n_stations - 1, 0)])
+
+    @property
+    def path(self):
+        """(n - 1, 5) view of the path, laid out as in calc_well_path"""
+        return self._view(self._path[1:max(self.n_stations, 1)])
+
+    @property
+    def positions(self):
+        """(n, 3) view of northing, easting and vertical at every station"""
+        return self._view(self._path[:max(self.n_stations, 1), :3])
+
+    @property
+    def current(self):
+        """northing, easting, vertical, reach and dogleg severity at the last station"""
+        return self._view(self._path[max(self.n_stations - 1, 0)])
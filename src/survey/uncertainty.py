@@ -0,0 +1,200 @@
+import numpy as np
+
+from .batch import _check_offsets, segmented_cumsum
+from .kernels import (SERIES_THRESHOLD, dogleg_from_terms, ratio_factor,
+                      slice_terms, station_terms)
+from .md_index import unit_tangent
+
+
+def tangent_derivatives(terms):
+    """
+    derivatives of the unit tangent with respect to inclination and azimuth
+
+    arguments:
+    terms: dict
+        station terms (kernels.station_terms)
+
+    returns:
+
+    tuple: ndarray
+        (..., 3) derivatives by inclination and by azimuth
+    """
+    zero = 0*terms["sin_inc"]*terms["sin_azim"]
+    d_inc = np.stack((terms["cos_inc"]*terms["cos_azim"],
+                      terms["cos_inc"]*terms["sin_azim"],
+                      -terms["sin_inc"] + zero), axis=-1)
+    d_azim = np.stack((-terms["sin_inc"]*terms["sin_azim"],
+                       terms["sin_inc"]*terms["cos_azim"],
+                       zero), axis=-1)
+    return d_inc, d_azim
+
+
+def ratio_factor_slope(beta):
+    """
+    calculate F'(beta)/sin(beta) of the ratio factor F = tan(beta/2)/(beta/2),
+    which turns the derivative of the dogleg into that of the ratio factor,
+    using its series expansion 1/6 + 11 beta^2/180 for nearly straight
+    segments
+
+    arguments:
+    beta: float or ndarray
+        dogleg angle in radians
+
+    returns:
+
+    float or ndarray:
+        F'(beta)/sin(beta), equal to 1/6 for a straight segment
+    """
+    beta = np.asarray(beta, dtype=float)
+    small = np.abs(beta) < SERIES_THRESHOLD
+    b = np.where(small, 1, beta)
+    half = 0.5*b
+    exact = (b/np.cos(half)**2 - 2*np.tan(half))/(b**2*np.sin(b))
+    return np.where(small, 1/6 + 11*beta**2/180, exact)
+
+
+def segment_jacobians(start, end):
+    """
+    analytic Jacobians of the minimum curvature segment
+    (dM/2) F(beta) (t1 + t2) with respect to the measured depth,
+    inclination and azimuth of its two stations
+
+    arguments:
+    start, end: dict
+        station terms of the first and second station of each segment
+
+    returns:
+
+    tuple: ndarray
+        (..., 3, 3) Jacobians by the start and by the end station. Rows are
+        northing, easting and vertical, columns measured depth,
+        inclination and azimuth
+    """
+    beta = dogleg_from_terms(start, end)
+    F = ratio_factor(beta)[..., None]
+    G = ratio_factor_slope(beta)[..., None]
+    half_dM = 0.5*(end["md"] - start["md"])[..., None]
+    t1, t2 = unit_tangent(start), unit_tangent(end)
+    total = t1 + t2
+
+    def by_angle(dt, other):
+        # d(beta) = -(other . dt)/sin(beta), so dF = -G (other . dt)
+        along = np.sum(other*dt, axis=-1, keepdims=True)
+        return half_dM*(F*dt - G*along*total)
+
+    d_inc1, d_azim1 = tangent_derivatives(start)
+    d_inc2, d_azim2 = tangent_derivatives(end)
+    d_md = 0.5*F*total
+    jac_start = np.stack((-d_md, by_angle(d_inc1, t2), by_angle(d_azim1, t2)), axis=-1)
+    jac_end = np.stack((d_md, by_angle(d_inc2, t1), by_angle(d_azim2, t1)), axis=-1)
+    return jac_start, jac_end
+
+
+def _variances(sigma, n_stations):
+    return np.broadcast_to(np.asarray(sigma, dtype=float), (n_stations, 3))
+
+
+def station_covariances_batch(md, inc, azim, offsets, sigma_random=0., sigma_systematic=0.):
+    """
+    batch version of station_covariances for many wells packed into flat
+    arrays, as in batch.calc_well_paths
+
+    arguments:
+    md, inc, azim: ndarray
+        flat measured depth, inclination and azimuth (radians) of all wells
+    offsets: ndarray
+        (n_wells + 1) offsets, well w occupies the stations
+        offsets[w]:offsets[w+1]
+    sigma_random, sigma_systematic: array-like
+        standard deviations of the measured depth, inclination and azimuth
+        errors, broadcast to (N, 3)
+
+    returns:
+
+    ndarray: float
+        (N, 3, 3) covariance of the northing, easting and vertical position
+        at every station
+    """
+    md = np.asarray(md, dtype=float)
+    offsets = _check_offsets(offsets, len(md))
+    n = len(md)
+    terms = station_terms(md, inc, azim)
+    jac_start, jac_end = segment_jacobians(slice_terms(terms, slice(None, -1)),
+                                           slice_terms(terms, slice(1, None)))
+    # pair j joins stations j and j+1; the pairs that straddle two wells are dropped
+    valid = np.ones(max(n - 1, 0), dtype=bool)
+    valid[offsets[1:-1] - 1] = False
+    jac_start[~valid] = 0
+    jac_end[~valid] = 0
+
+    # an error at station j moves every later station of its well through
+    # both adjacent segments, and the station itself through the one ending there
+    last = np.zeros((n, 3, 3))
+    last[1:] = jac_end
+    through = last.copy()
+    through[:-1] += jac_start
+
+    random = _variances(sigma_random, n)**2
+    covariance = np.einsum("nik,nk,njk->nij", last, random, last)
+    term = np.einsum("nik,nk,njk->nij", through, random, through)
+    covariance += segmented_cumsum(term, offsets) - term
+
+    systematic = _variances(sigma_systematic, n)
+    if np.any(systematic):
+        scaled = through*systematic[:, None, :]
+        total = segmented_cumsum(scaled, offsets) - scaled + last*systematic[:, None, :]
+        covariance += np.einsum("nik,njk->nij", total, total)
+    return covariance
+
+
+def station_covariances(md, inc, azim, sigma_random=0., sigma_systematic=0.):
+    """
+    propagate measured depth, inclination and azimuth errors through the
+    minimum curvature formulas to a 3x3 position covariance at every
+    station, with the analytic segment Jacobians and without sampling.
+    Random errors are independent between stations, systematic errors are
+    fully correlated along the well
+
+    arguments:
+    md, inc, azim: array-like
+        (..., n) surveys, angles in radians; leading axes are independent
+        wells
+    sigma_random, sigma_systematic: array-like
+        standard deviations of the measured depth, inclination and azimuth
+        (radians) errors, broadcast to (..., n, 3)
+
+    returns:
+
+    ndarray: float
+        (..., n, 3, 3) covariance of the northing, easting and vertical
+        position at every station, zero at the first station
+    """
+    md, inc, azim = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (md, inc, azim)))
+    shape = md.shape
+    n_wells = int(np.prod(shape[:-1]))
+    offsets = np.arange(n_wells + 1)*shape[-1]
+    sigmas = [np.broadcast_to(np.asarray(sigma, dtype=float), shape + (3,)).reshape(-1, 3)
+              for sigma in (sigma_random, sigma_systematic)]
+    covariance = station_covariances_batch(md.ravel(), inc.ravel(), azim.ravel(),
+                                           offsets, *sigmas)
+    return covariance.reshape(shape + (3, 3))
+
+
+def error_ellipsoids(covariance, scale=1.):
+    """
+    principal semi-axes of covariance ellipsoids
+
+    arguments:
+    covariance: ndarray
+        (..., 3, 3) position covariances
+    scale: float
+        number of standard deviations of the ellipsoid
+
+    returns:
+
+    tuple: ndarray
+        (..., 3) semi-axis lengths in ascending order, and (..., 3, 3)
+        unit axes as columns
+    """
+    values, vectors = np.linalg.eigh(covariance)
+    return scale*np.sqrt(np.clip(values, 0, None)), vectors
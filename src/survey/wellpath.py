@@ -1,5 +1,8 @@
 import numpy as np
 
+from .batch import segmented_cumsum, _check_offsets
+from .kernels import dogleg, ratio_factor
+
 # full_trajectory = {
 #     "measured_depth": [],
 #     "inclination": [],
@@ -41,13 +44,9 @@ def minCurvatureSegment(md1, inc1, azim1, md2, inc2, azim2):
         A list with the lengths dx, dy and dz of the segment
     """
     ds = md2-md1
-    dinc = inc2-inc1
-    dazim = azim2-azim1
-    slantAngle = 2*np.arcsin(
-                    np.sqrt(
-                        np.sin(0.5*dinc)**2 + 
-                        np.sin(inc2)*np.sin(inc1)*np.sin(0.5*dazim)**2))
-    RF = (ds/slantAngle)*np.tan(0.5*slantAngle)
+    slantAngle = dogleg(inc1, azim1, inc2, azim2)
+    # equals ds/2 on straight segments, where the closed form is 0/0
+    RF = 0.5*ds*ratio_factor(slantAngle)
     dx = (np.sin(inc1)*np.cos(azim1)+
           np.sin(inc2)*np.cos(azim2))*RF
     dy = (np.sin(inc1)*np.sin(azim1)+
@@ -82,21 +81,51 @@ def straigntSegment(md1, md2, inc, azim):
     return dx, dy, dz
 
 def calcCoordinatesFromSimplifiedData(measured_depth, inclination, azimuth, start_point):
-    measured_depth = np.array(measured_depth)
-    inclination = np.array(inclination)
-    azimuth = np.array(azimuth)
-    dxyz = np.zeros((len(measured_depth),3))
-    for i in range(1, len(measured_depth)):
-        md1, md2 = measured_depth[i-1:i+1]
-        inc1, inc2 = inclination[i-1:i+1]
-        azim1, azim2 = azimuth[i-1:i+1]
-        if azim1 == azim2 and inc1 == inc2:
-            dxyz[i,:] = straigntSegment(md1, md2, inc2, azim2)
-        else:
-            dxyz[i,:] = minCurvatureSegment(md1, inc1, azim1, md2, inc2, azim2)
-    xyz = np.array([start_point[i] + np.cumsum(dxyz[:,i]) for i in range(3)])
-    coordinates = xyz.T
-    return coordinates
+    measured_depth = np.asarray(measured_depth, dtype=float)
+    return calcCoordinatesFromSimplifiedBatch(measured_depth, inclination, azimuth,
+                                              [0, len(measured_depth)], [start_point])
+
+def minCurvatureSegments(md1, inc1, azim1, md2, inc2, azim2):
+    """"
+    vectorized version of minCurvatureSegment
+
+    arguments:
+    md1, inc1, azim1: ndarray
+        measured depth, inclination and azimuth at the first station of each
+        segment (radians)
+    md2, inc2, azim2: ndarray
+        measured depth, inclination and azimuth at the second station of each
+        segment (radians)
+
+    returns:
+
+    ndarray: float
+        An (n, 3) array with the lengths dx, dy and dz of every segment
+    """
+    segment = minCurvatureSegment(md1, inc1, azim1, md2, inc2, azim2)
+    return np.column_stack(np.broadcast_arrays(*segment))
+
+def calcCoordinatesFromSimplifiedBatch(measured_depth, inclination, azimuth, offsets, start_points):
+    """calculate the coordinates of many wells packed into flat arrays
+
+    arguments:
+    measured_depth, inclination, azimuth: flat arrays with all wells concatenated
+    offsets: (n_wells + 1) array, well w occupies offsets[w]:offsets[w+1]
+    start_points: (n_wells, 3) array with the first point of each well
+
+    returns:
+    coordinates: (N, 3) ndarray with the coordinates of every station
+    """
+    measured_depth = np.asarray(measured_depth, dtype=float)
+    inclination = np.asarray(inclination, dtype=float)
+    azimuth = np.asarray(azimuth, dtype=float)
+    offsets = _check_offsets(offsets, len(measured_depth))
+    dxyz = np.zeros((len(measured_depth), 3))
+    dxyz[1:] = minCurvatureSegments(measured_depth[:-1], inclination[:-1], azimuth[:-1],
+                                    measured_depth[1:], inclination[1:], azimuth[1:])
+    # the first station of every well starts at its own start point
+    dxyz[offsets[:-1]] = 0
+    return segmented_cumsum(dxyz, offsets, start_points)
 
 def serializeFromHydra(data, degrees=True):
     table = np.array(data["table"])
@@ -135,18 +164,56 @@ def getLocalCsysAtVerticalDetpth(full_trajectory, tvd):
     interp_point = getDataAtVerticalDepth(full_trajectory, tvd)
     if interp_point is None:
         return None, None
-    theta1 = interp_point["inclination"]
-    theta2 = interp_point["azimuth"]
-    ROTAZIM = np.array(((np.cos(theta2), np.sin(theta2),0),
-                        (-np.sin(theta2), np.cos(theta2),0),
-                        (0,0,1)))
-    ROTINC = np.array(((np.cos(theta1), 0, -np.sin(theta1)),
-                        (0,1,0),
-                        (np.sin(theta1), 0, np.cos(theta1))))
-    v = np.eye(3)
-    csys = np.dot(ROTINC,np.dot(ROTAZIM, v))
+    csys = localCsysFromAngles(interp_point["inclination"], interp_point["azimuth"])
     return csys, interp_point
 
+def localCsysFromAngles(inclination, azimuth, vectors_only=False):
+    """calculate the local coordinate systems for arrays of inclination and
+    azimuth in one vectorized call. Each frame is the rotation ROTINC . ROTAZIM
+    of getLocalCsysAtVerticalDetpth written out in closed form, its rows
+    being the high side (normal), right (binormal) and tangent unit vectors
+
+    arguments:
+    inclination: float or array with inclination with respect to vertical (radians)
+    azimuth: float or array with azimuth with respect to north (radians)
+    vectors_only: if True, return the tangent, normal and binormal vectors
+        instead of the stacked frames
+
+    returns:
+    csys: (..., 3, 3) ndarray with one local coordinate system per point, or
+    tangent, normal, binormal: (..., 3) ndarrays if vectors_only is True
+    """
+    inclination = np.asarray(inclination, dtype=float)
+    azimuth = np.asarray(azimuth, dtype=float)
+    sin_inc, cos_inc = np.sin(inclination), np.cos(inclination)
+    sin_azim, cos_azim = np.sin(azimuth), np.cos(azimuth)
+    zero = 0*sin_inc*sin_azim  # keeps NaN angles NaN in every row
+    normal = np.stack(np.broadcast_arrays(cos_inc*cos_azim, cos_inc*sin_azim, -sin_inc), axis=-1)
+    binormal = np.stack(np.broadcast_arrays(-sin_azim, cos_azim, zero), axis=-1)
+    tangent = np.stack(np.broadcast_arrays(sin_inc*cos_azim, sin_inc*sin_azim, cos_inc), axis=-1)
+    if vectors_only:
+        return tangent, normal, binormal
+    return np.stack((normal, binormal, tangent), axis=-2)
+
+def getLocalCsysAtVerticalDepths(full_trajectory, tvd, vectors_only=False):
+    """batched version of getLocalCsysAtVerticalDetpth for an array of
+    vertical coordinates
+
+    arguments:
+    full trajectory: dict with full trajectory
+    tvd: array with desired vertical coordinates
+    vectors_only: if True, return the tangent, normal and binormal vectors
+        instead of the stacked frames
+
+    returns:
+    csys: (N, 3, 3) ndarray with the local coordinate systems, NaN outside
+        the trajectory (or the tangent, normal, binormal vectors)
+    points: dict with the interpolated full trajectory arrays
+    """
+    points = getDataAtVerticalDepths(full_trajectory, tvd)
+    csys = localCsysFromAngles(points["inclination"], points["azimuth"], vectors_only)
+    return csys, points
+
 def getDataAtVerticalDepth(full_trajectory, tvd):
     if tvd > full_trajectory["z"][-1] or tvd < full_trajectory["z"][0]:
         return None
@@ -160,6 +227,22 @@ def getDataAtVerticalDepth(full_trajectory, tvd):
             }
     return point
 
+def getDataAtVerticalDepths(full_trajectory, tvd):
+    """batched version of getDataAtVerticalDepth, with NaN in place of the
+    points outside the trajectory"""
+    tvd = np.asarray(tvd, dtype=float)
+    z = np.asarray(full_trajectory["z"], dtype=float)
+    outside = (tvd > z[-1]) | (tvd < z[0])
+    interpol = lambda var: np.where(outside, np.nan, np.interp(tvd, z, var))
+    points = {"measured_depth": interpol(full_trajectory["measured_depth"]),
+              "inclination": interpol(full_trajectory["inclination"]),
+              "azimuth": interpol(full_trajectory["azimuth"]),
+              "x": interpol(full_trajectory["x"]),
+              "y": interpol(full_trajectory["y"]),
+              "z": np.where(outside, np.nan, tvd)
+             }
+    return points
+
 def getPointCoordinates(point):
     return point["x"], point["y"], point["z"]
 
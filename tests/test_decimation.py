@@ -0,0 +1,38 @@
+import numpy as np
+
+from benchmarks.synthetic import synthetic_survey
+from src.survey import TrajectoryIndex, decimate_survey
+from src.survey.wellpath import calcCoordinatesFromSimplifiedData
+
+START = (100., -50., 0.)
+
+
+def rebuilt_deviation(md, inc, azim, result):
+    # position change at every original station, from the kept stations alone
+    original = calcCoordinatesFromSimplifiedData(md, inc, azim, START)
+    index = TrajectoryIndex(result["measured_depth"], result["inclination"],
+                            result["azimuth"], start_point=START)
+    point = index.at_md(md)
+    rebuilt = np.column_stack((point["x"], point["y"], point["z"]))
+    return np.linalg.norm(rebuilt - original, axis=1)
+
+
+def test_max_deviation_matches_rebuilt_path():
+    md, inc, azim = synthetic_survey(2000, seed=3).T
+    result = decimate_survey(md, inc, azim, 0.5, start_points=[START])
+    assert result["converged"]
+    assert result["mask"].sum() < len(md)
+    deviation = rebuilt_deviation(md, inc, azim, result)
+    np.testing.assert_allclose(result["deviation"], deviation, atol=1e-6)
+    np.testing.assert_allclose(result["max_deviation"], deviation.max(), atol=1e-6)
+    assert result["max_deviation"] <= 0.5
+
+
+def test_reports_when_iterations_run_out():
+    md, inc, azim = synthetic_survey(2000, seed=3).T
+    result = decimate_survey(md, inc, azim, 0.05, start_points=[START], max_iterations=1)
+    assert result["interval_tolerance"] == 0.05
+    assert not result["converged"]
+    assert result["max_deviation"] > 0.05
+    np.testing.assert_allclose(result["max_deviation"],
+                               rebuilt_deviation(md, inc, azim, result).max(), atol=1e-6)
@@ -0,0 +1,22 @@
+import io
+
+import numpy as np
+
+from src.survey import loader
+
+HEADER = "well,measuredDepth,inclination,azimuth\n"
+
+
+def test_quoted_and_bare_names_key_the_same_well():
+    text = HEADER + '"A-1",0,0,0\nA-1,30,3,40\n"B,2",0,0,0\n"B,2",30,2,10\nA-1,60,6,40\n'
+    batch = loader.load_survey_csv(io.StringIO(text), chunk_size=2)
+    assert list(batch["wells"]) == ["A-1", "B,2"]
+    np.testing.assert_array_equal(batch["offsets"], [0, 3, 5])
+    np.testing.assert_allclose(np.rad2deg(batch["inclination"]), [0, 3, 6, 0, 2])
+
+
+def test_empty_inputs_give_an_empty_batch():
+    for batch in (loader.load_survey_csv(io.StringIO(HEADER)),
+                  loader.load_survey_jsonl(io.StringIO(""))):
+        np.testing.assert_array_equal(batch["offsets"], [0])
+        assert len(batch["wells"]) == len(batch["measured_depth"]) == len(batch["x"]) == 0
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from src import plan, survey
+
+PLANS = {"WellTypeI": ((3000, 800, 2, 700), {}),
+         "WellTypeII": ((3309, 945, 2, 640, 2, 3109), {}),
+         "WellTypeIII": ((3000, 2200, 2, 300), {}),
+         "WellHorizontalSingleGain": ((1676, 305, 2500), {}),
+         "WellHorizontalDualGain": ((1676, 305, 2, 1.5, 1000), {"reach": 3438})}
+
+
+def calculated(name):
+    args, kwargs = PLANS[name]
+    well = getattr(plan, name)(*args, **kwargs)
+    well.calculate()
+    return well
+
+
+@pytest.mark.parametrize("name", PLANS)
+def test_plan_survey_stations(name):
+    well = calculated(name)
+    stations = plan.planToSurvey(well, 30., step=30.)
+    assert np.all(np.isfinite(stations))
+    assert np.all(np.diff(stations[:, 0]) > 0)
+    assert np.all(np.isin([m["MD"] for m in well.milestones.values()], stations[:, 0]))
+    # the minimum curvature path through the stations is the plan itself
+    _, path = survey.calc_well_path(stations)
+    expected = well.generatePathAtMD(stations[1:, 0])
+    np.testing.assert_allclose(path[:, 2], expected["TVD"], atol=1e-6)
+    np.testing.assert_allclose(np.hypot(path[:, 0], path[:, 1]), expected["Displacement"], atol=1e-6)
+
+
+@pytest.mark.parametrize("name", PLANS)
+def test_bit_walk_on_plan_stations(name):
+    md, inc, azim = plan.planToSurvey(calculated(name), 45.).T
+    result = plan.BitWalkModel(build_rate=0.1, walk_rate=0.2, build_std=0.1,
+                               walk_std=0.1, start_md=300).simulate(md, inc, azim, 50, rng=0)
+    assert np.all(np.isfinite(result["positions"]))
@@ -0,0 +1,24 @@
+import numpy as np
+
+from src.steering import plan_steering
+from src.survey.kernels import dogleg
+
+
+def test_reversal_reaches_target():
+    # a 90 deg dogleg at 5 deg/30m takes 18 stands
+    result = plan_steering(1000, np.deg2rad(45), 0, np.deg2rad(45), np.pi, max_dls=5)
+    assert result["reached"]
+    assert len(result["tool_face"]) == 18
+    assert np.all(result["dls"] <= 5 + 1e-9)
+
+
+def test_random_attitude_changes_reach_target():
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        inc0, azim0, inc1, azim1 = rng.uniform([0, 0, 0, 0], [np.pi/2, 2*np.pi, np.pi/2, 2*np.pi])
+        result = plan_steering(0, inc0, azim0, inc1, azim1, max_dls=4)
+        assert result["reached"]
+        needed = np.ceil(dogleg(inc0, azim0, inc1, azim1)/np.deg2rad(4) - 1e-9)
+        assert len(result["tool_face"]) <= needed + 1
+        final = result["survey"][-1]
+        assert dogleg(final[1], final[2], inc1, azim1) <= np.deg2rad(0.01)